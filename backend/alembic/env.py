@@ -12,6 +12,10 @@ from app.database import Base
 from app.models.user import User
 from app.models.project import Project, ProjectMember
 from app.models.task import Task, TaskLog
+from app.models.module import Module
+from app.models.stats import ProjectStats, ProjectMemberStats
+from app.models.event import ProjectEvent
+from app.models.token import RefreshToken, TokenRevocation
 from app.config import settings
 
 # this is the Alembic Config object, which provides
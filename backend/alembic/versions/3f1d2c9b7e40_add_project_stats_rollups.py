@@ -0,0 +1,64 @@
+"""add project stats rollup tables
+
+Revision ID: 3f1d2c9b7e40
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-16 09:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '3f1d2c9b7e40'
+down_revision: Union[str, Sequence[str], None] = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_stats',
+        sa.Column('project_id', sa.UUID(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('todo', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('in_progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('done', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('blocked', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id']),
+        sa.PrimaryKeyConstraint('project_id'),
+    )
+    op.create_table(
+        'project_member_stats',
+        sa.Column('project_id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('done', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('project_id', 'user_id'),
+    )
+    op.execute("""
+        INSERT INTO project_stats (project_id, total, todo, in_progress, done, blocked, progress_sum)
+        SELECT p.id,
+               count(t.id),
+               count(t.id) FILTER (WHERE t.status = 'todo'),
+               count(t.id) FILTER (WHERE t.status = 'in_progress'),
+               count(t.id) FILTER (WHERE t.status = 'done'),
+               count(t.id) FILTER (WHERE t.status = 'blocked'),
+               coalesce(sum(t.progress), 0)
+        FROM projects p LEFT JOIN tasks t ON t.project_id = p.id
+        GROUP BY p.id
+    """)
+    op.execute("""
+        INSERT INTO project_member_stats (project_id, user_id, total, done)
+        SELECT project_id, assignee_id, count(*), count(*) FILTER (WHERE status = 'done')
+        FROM tasks
+        WHERE assignee_id IS NOT NULL
+        GROUP BY project_id, assignee_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('project_member_stats')
+    op.drop_table('project_stats')
@@ -0,0 +1,27 @@
+"""add composite indexes for task listing
+
+Revision ID: 7b2e4f6a8c10
+Revises: 3f1d2c9b7e40
+Create Date: 2026-10-16 10:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '7b2e4f6a8c10'
+down_revision: Union[str, Sequence[str], None] = '3f1d2c9b7e40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_project_created', 'tasks', ['project_id', 'created_at', 'id'])
+    op.create_index('ix_tasks_project_status', 'tasks', ['project_id', 'status'])
+    op.create_index('ix_tasks_project_assignee', 'tasks', ['project_id', 'assignee_id'])
+    op.create_index('ix_tasks_project_due_date', 'tasks', ['project_id', 'due_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_project_due_date', 'tasks')
+    op.drop_index('ix_tasks_project_assignee', 'tasks')
+    op.drop_index('ix_tasks_project_status', 'tasks')
+    op.drop_index('ix_tasks_project_created', 'tasks')
@@ -0,0 +1,21 @@
+"""add composite index for the task log timeline
+
+Revision ID: 9c4d1e2f3a50
+Revises: 7b2e4f6a8c10
+Create Date: 2026-10-16 11:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '9c4d1e2f3a50'
+down_revision: Union[str, Sequence[str], None] = '7b2e4f6a8c10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_task_logs_task_created', 'task_logs', ['task_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_logs_task_created', 'task_logs')
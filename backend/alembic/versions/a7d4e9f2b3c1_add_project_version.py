@@ -0,0 +1,22 @@
+"""add version counter to project_stats for ETags
+
+Revision ID: a7d4e9f2b3c1
+Revises: f3c9d5e1a2b6
+Create Date: 2026-10-16 16:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'a7d4e9f2b3c1'
+down_revision: Union[str, Sequence[str], None] = 'f3c9d5e1a2b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('project_stats', sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('project_stats', 'version')
@@ -0,0 +1,35 @@
+"""add project change feed table
+
+Revision ID: b8e1f4a6c9d2
+Revises: a7d4e9f2b3c1
+Create Date: 2026-10-16 17:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'b8e1f4a6c9d2'
+down_revision: Union[str, Sequence[str], None] = 'a7d4e9f2b3c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_events',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('project_id', sa.UUID(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_project_events_project_id_id', 'project_events', ['project_id', 'id'])
+    op.create_index('ix_project_events_created_at', 'project_events', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_project_events_created_at', 'project_events')
+    op.drop_index('ix_project_events_project_id_id', 'project_events')
+    op.drop_table('project_events')
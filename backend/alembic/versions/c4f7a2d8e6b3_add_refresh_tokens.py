@@ -0,0 +1,50 @@
+"""add token versions, refresh tokens and token revocations
+
+Revision ID: c4f7a2d8e6b3
+Revises: b8e1f4a6c9d2
+Create Date: 2026-10-16 18:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'c4f7a2d8e6b3'
+down_revision: Union[str, Sequence[str], None] = 'b8e1f4a6c9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('replaced_by', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id'])
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'])
+    op.create_table(
+        'token_revocations',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('jti', sa.UUID(), nullable=True),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('min_version', sa.Integer(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_token_revocations_expires_at', 'token_revocations', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_revocations_expires_at', 'token_revocations')
+    op.drop_table('token_revocations')
+    op.drop_index('ix_refresh_tokens_expires_at', 'refresh_tokens')
+    op.drop_index('ix_refresh_tokens_user_id', 'refresh_tokens')
+    op.drop_table('refresh_tokens')
+    op.drop_column('users', 'token_version')
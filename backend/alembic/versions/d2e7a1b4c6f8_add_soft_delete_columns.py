@@ -0,0 +1,31 @@
+"""add deleted_at to projects and modules
+
+Revision ID: d2e7a1b4c6f8
+Revises: 9c4d1e2f3a50
+Create Date: 2026-10-16 13:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd2e7a1b4c6f8'
+down_revision: Union[str, Sequence[str], None] = '9c4d1e2f3a50'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('modules', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # Partial indexes: only the few rows waiting for the purger are indexed.
+    op.create_index('ix_projects_deleted_at', 'projects', ['deleted_at'],
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.create_index('ix_modules_deleted_at', 'modules', ['deleted_at'],
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_modules_deleted_at', 'modules')
+    op.drop_index('ix_projects_deleted_at', 'projects')
+    op.drop_column('modules', 'deleted_at')
+    op.drop_column('projects', 'deleted_at')
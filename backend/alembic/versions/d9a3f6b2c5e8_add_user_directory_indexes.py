@@ -0,0 +1,33 @@
+"""add user directory indexes
+
+Revision ID: d9a3f6b2c5e8
+Revises: c4f7a2d8e6b3
+Create Date: 2026-10-16 19:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd9a3f6b2c5e8'
+down_revision: Union[str, Sequence[str], None] = 'c4f7a2d8e6b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_users_created', 'users', ['created_at', 'id'])
+    op.create_index('ix_users_name_prefix', 'users', [sa.text('lower(name) text_pattern_ops')])
+    op.create_index('ix_users_email_prefix', 'users', [sa.text('lower(email) text_pattern_ops')])
+    op.create_index('ix_users_name_trgm', 'users', ['name'],
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_users_email_trgm', 'users', ['email'],
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_trgm', 'users')
+    op.drop_index('ix_users_name_trgm', 'users')
+    op.drop_index('ix_users_email_prefix', 'users')
+    op.drop_index('ix_users_name_prefix', 'users')
+    op.drop_index('ix_users_created', 'users')
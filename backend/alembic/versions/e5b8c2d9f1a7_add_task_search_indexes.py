@@ -0,0 +1,29 @@
+"""add trigram indexes for task search
+
+Revision ID: e5b8c2d9f1a7
+Revises: d2e7a1b4c6f8
+Create Date: 2026-10-16 14:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'e5b8c2d9f1a7'
+down_revision: Union[str, Sequence[str], None] = 'd2e7a1b4c6f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_tasks_title_trgm', 'tasks', ['title'],
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_tasks_description_trgm', 'tasks', ['description'],
+                    postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    op.create_index('ix_task_logs_content_trgm', 'task_logs', ['content'],
+                    postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_logs_content_trgm', 'task_logs')
+    op.drop_index('ix_tasks_description_trgm', 'tasks')
+    op.drop_index('ix_tasks_title_trgm', 'tasks')
@@ -0,0 +1,21 @@
+"""add assignee-centric task index for my tasks
+
+Revision ID: f3c9d5e1a2b6
+Revises: e5b8c2d9f1a7
+Create Date: 2026-10-16 15:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'f3c9d5e1a2b6'
+down_revision: Union[str, Sequence[str], None] = 'e5b8c2d9f1a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_assignee_status_due_date', 'tasks', ['assignee_id', 'status', 'due_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_assignee_status_due_date', 'tasks')
@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+from app.config import settings
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[dict]: ...
+    def set(self, key: str, value: dict, ttl: float) -> None: ...
+    def delete(self, key: str) -> None: ...
+    def delete_prefix(self, prefix: str) -> None: ...
+    def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """Bounded LRU with per-entry expiry, local to one worker process."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Shared across workers and hosts; works with any Redis-protocol server."""
+
+    def __init__(self, url: str, namespace: str = "kuafu:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self._ns = namespace
+
+    def get(self, key: str) -> Optional[dict]:
+        raw = self._client.get(self._ns + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        self._client.set(self._ns + key, json.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._ns + key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = list(self._client.scan_iter(match=self._ns + prefix + "*", count=500))
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self) -> None:
+        self.delete_prefix("")
+
+
+def create_cache() -> CacheBackend:
+    if settings.cache_backend == "memory":
+        return MemoryCache(settings.cache_max_entries)
+    if settings.cache_backend == "redis":
+        if not settings.cache_redis_url:
+            raise RuntimeError("CACHE_BACKEND=redis requires CACHE_REDIS_URL")
+        return RedisCache(settings.cache_redis_url)
+    raise RuntimeError(f"Unknown CACHE_BACKEND: {settings.cache_backend}")
+
+
+cache = create_cache()
@@ -1,11 +1,75 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env")
 
     database_url: str
+    # Async driver URL; derived from database_url (asyncpg) when not set
+    database_async_url: Optional[str] = None
+
+    # Connection pool, per worker process: size it so that
+    # workers * (db_pool_size + db_max_overflow) stays below max_connections.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    # Seconds before a connection is replaced; -1 keeps them forever
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Postgres statement_timeout in milliseconds; 0 leaves the server default
+    db_statement_timeout_ms: int = 0
+    # Connecting through pgbouncer in transaction mode: no client-side pool,
+    # no startup parameters and no prepared statements
+    db_pgbouncer: bool = False
+
     secret_key: str
-    access_token_expire_minutes: int = 480
+    # Access tokens are stateless and short-lived; refresh tokens are rotated on every use
+    access_token_expire_minutes: int = 15
+    refresh_token_expire_days: int = 14
+    # A rotated refresh token presented again this soon (another tab racing
+    # the first) gets the same successor instead of revoking the session
+    refresh_reuse_grace_seconds: int = 30
+    # How often a worker picks up tokens revoked by other workers
+    revocation_sync_seconds: float = 5
+    # bcrypt cost; existing hashes below it are upgraded on login
+    password_bcrypt_rounds: int = 12
+    # Processes doing bcrypt work; 0 hashes in the request thread
+    password_hash_workers: int = 2
+    # Hashing calls queued or running at once before logins get a 503
+    password_hash_queue_limit: int = 16
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:5174", "http://localhost:5175"]
+    # Make list queries raise on any relationship they did not load explicitly (tests/CI)
+    orm_raise_on_lazy_load: bool = False
+
+    # Lookup caches: "memory" is per worker process (bounded by the TTL after a
+    # change made through another worker); "redis" is shared by all workers.
+    cache_backend: str = "memory"
+    cache_redis_url: Optional[str] = None
+    cache_max_entries: int = 10000
+    auth_cache_ttl_seconds: int = 60
+    access_cache_ttl_seconds: int = 300
+
+    # Background XLSX exports
+    export_workers: int = 2
+    export_queue_limit: int = 8
+    export_cache_dir: str = "/tmp/kuafu-exports"
+
+    # Purging of soft-deleted projects and modules; 0 disables the in-process
+    # purger (run scripts/purge_deleted.py from cron instead)
+    purge_interval_seconds: int = 60
+    purge_batch_size: int = 500
+
+    # Project change feed: events older than this are trimmed by the purger,
+    # and clients replaying from before then must reload
+    event_retention_hours: int = 24
+    # Keepalive interval of event streams; also their polling interval when
+    # LISTEN/NOTIFY is unavailable (db_pgbouncer)
+    event_heartbeat_seconds: float = 15
+
+    # Per-route latency, SQL and response size metrics served at /metrics
+    metrics_enabled: bool = False
+    # Requests slower than this are logged with their costliest statements; 0 disables
+    slow_request_ms: int = 1000
+    slow_request_top_queries: int = 5
 
 settings = Settings()
@@ -1,16 +1,142 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.config import settings
+from app.metrics import db_checkout_seconds, db_checkout_timeouts
 
-engine = create_engine(settings.database_url)
+
+class _TimedCheckout:
+    """Records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_checkout_timeouts.inc()
+            raise
+        finally:
+            db_checkout_seconds.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    options = {}
+    connect_args = {}
+    if settings.db_pgbouncer:
+        # pgbouncer owns the pool; holding connections here would pin server slots.
+        options["poolclass"] = NullPool
+        if is_async:
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+        if settings.db_statement_timeout_ms and url.startswith("postgresql"):
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def _set_local_statement_timeout(engine: Engine) -> None:
+    # pgbouncer rejects startup parameters and hands out a different server
+    # connection per transaction, so the timeout is set on every transaction.
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.db_statement_timeout_ms)}")
+
+
+def _configure(engine: Engine, url: str) -> None:
+    if settings.db_pgbouncer and settings.db_statement_timeout_ms and url.startswith("postgresql"):
+        _set_local_statement_timeout(engine)
+
+
+def pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+
+
+engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+_configure(engine, settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+_async_engine: AsyncEngine | None = None
+_AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
 class Base(DeclarativeBase):
     pass
 
+def eager(*options):
+    """Loader options for a list query.
+
+    With ``orm_raise_on_lazy_load`` enabled every relationship not named in
+    ``options`` raises on access instead of issuing one SELECT per row.
+    """
+    if settings.orm_raise_on_lazy_load:
+        return (*options, raiseload("*"))
+    return options
+
+def async_database_url(url: str) -> str:
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+def get_async_engine() -> AsyncEngine:
+    # Created on first use so the sync-only paths (scripts, tests) never need asyncpg.
+    global _async_engine
+    if _async_engine is None:
+        url = settings.database_async_url or async_database_url(settings.database_url)
+        _async_engine = create_async_engine(url, **_engine_options(url, is_async=True))
+        _configure(_async_engine.sync_engine, url)
+    return _async_engine
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,110 @@
+"""Per-request latency, SQL and response size metrics (``metrics_enabled``).
+
+The middleware opens a ``RequestStats`` in a context variable; engine event
+hooks add every statement executed while it is open. Sync endpoints and
+dependencies run in worker threads with a copy of the context, so their
+statements land in the same ``RequestStats``.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.metrics import http_request_seconds, http_request_queries, http_request_db_seconds, http_response_bytes
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestStats"]] = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        # statement -> [executions, seconds], for the slow-request log
+        self.statements: dict[str, list] = {}
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def top(self, n: int) -> list[tuple[str, int, float]]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [(statement, count, seconds) for statement, (count, seconds) in ranked]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.add(statement, time.perf_counter() - started)
+
+
+def instrument_engines() -> None:
+    # Listening on the Engine class covers database.engine, the async engine's
+    # sync_engine and any engine created later.
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _log_slow_request(method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+    top = "".join(f"\n  {s * 1000:.1f}ms x{n}: {' '.join(statement.split())[:300]}"
+                  for statement, n, s in stats.top(settings.slow_request_top_queries))
+    logger.warning("Slow request %s %s -> %s in %.1fms (%d queries, %.1fms in SQL)%s",
+                   method, route, status, seconds * 1000, stats.queries, stats.db_seconds * 1000, top)
+
+
+class InstrumentationMiddleware:
+    """Records each HTTP request under its route template.
+
+    Event streams are left out: their duration is the subscription's, not a
+    response time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status, size, streaming = 500, 0, False
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(k == b"content-type" and v.startswith(b"text/event-stream")
+                                for k, v in message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if not streaming:
+                seconds = time.perf_counter() - started
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                method = scope["method"]
+                http_request_seconds.child(method, route, str(status)).observe(seconds)
+                http_request_queries.child(method, route).observe(stats.queries)
+                http_request_db_seconds.child(method, route).observe(stats.db_seconds)
+                http_response_bytes.child(method, route).observe(size)
+                if settings.slow_request_ms and seconds * 1000 >= settings.slow_request_ms:
+                    _log_slow_request(method, route, status, seconds, stats)
@@ -1,9 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
+from app.database import engine, pool_status
+from app.instrumentation import InstrumentationMiddleware, instrument_engines
+from app.metrics import db_checkout_seconds, db_checkout_timeouts, render_prometheus
 from app.routers import auth, users, projects, tasks, modules
+from app.services.auth_service import shutdown_hashing
+from app.services.event_service import stop_listener
+from app.services.purge_service import start_purger, stop_purger
 
-app = FastAPI(title="KuaFu API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_purger()
+    yield
+    stop_purger()
+    await stop_listener()
+    shutdown_hashing()
+
+
+app = FastAPI(title="KuaFu API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,7 +29,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+if settings.metrics_enabled:
+    instrument_engines()
+    app.add_middleware(InstrumentationMiddleware)
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
@@ -22,3 +44,15 @@ app.include_router(modules.router, prefix="/api/v1", tags=["modules"])
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+@app.get("/health/db")
+def health_db():
+    return {
+        **pool_status(engine),
+        "checkout_timeouts": db_checkout_timeouts.value,
+        "checkout_seconds": db_checkout_seconds.snapshot(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,114 @@
+import bisect
+import threading
+
+# Latency buckets in seconds, upper bounds (the last bucket is +Inf).
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, safe to observe from any thread."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = {}, 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"count": running, "sum": total, "buckets": cumulative}
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per combination of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...],
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._children: dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def child(self, *values) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in sorted(children):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            lines.extend(_render_histogram(self.name, labels, child.snapshot()))
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(name: str, labels: str, snap: dict) -> list[str]:
+    sep = "," if labels else ""
+    lines = [f'{name}_bucket{{{labels}{sep}le="{le}"}} {count}' for le, count in snap["buckets"].items()]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {snap['sum']}")
+    lines.append(f"{name}_count{suffix} {snap['count']}")
+    return lines
+
+
+# Time spent waiting for a pooled connection, and checkouts that gave up.
+db_checkout_seconds = Histogram()
+db_checkout_timeouts = Counter()
+
+# Per-route request metrics, recorded by app.instrumentation when metrics_enabled.
+# Routes are the path templates, so ids never become label values.
+http_request_seconds = HistogramFamily(
+    "http_request_duration_seconds", "Request latency.", ("method", "route", "status"))
+http_request_queries = HistogramFamily(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS)
+http_request_db_seconds = HistogramFamily(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ("method", "route"))
+http_response_bytes = HistogramFamily(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS)
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for family in (http_request_seconds, http_request_queries, http_request_db_seconds, http_response_bytes):
+        lines.extend(family.render())
+    lines += ["# HELP db_checkout_seconds Time spent waiting for a pooled connection.",
+              "# TYPE db_checkout_seconds histogram",
+              *_render_histogram("db_checkout_seconds", "", db_checkout_seconds.snapshot()),
+              "# HELP db_checkout_timeouts_total Checkouts that gave up waiting.",
+              "# TYPE db_checkout_timeouts_total counter",
+              f"db_checkout_timeouts_total {db_checkout_timeouts.value}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+
+class ProjectEvent(Base):
+    """Change feed of a project; ``id`` is the sequence number clients replay from."""
+    __tablename__ = "project_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    project_id = Column(UUID(as_uuid=True), nullable=False)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_project_events_project_id_id", "project_id", "id"),
+    )
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index, exists, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -15,7 +15,18 @@ class Module(Base):
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     order = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set by delete_module; the purger removes the module and its tasks later.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_modules_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     project = relationship("Project", back_populates="modules")
     owner = relationship("User")
     tasks = relationship("Task", back_populates="module")
+
+
+def in_deleted_module(module_id):
+    """True for rows whose ``module_id`` points at a soft-deleted module."""
+    return exists().where(Module.id == module_id, Module.deleted_at.isnot(None))
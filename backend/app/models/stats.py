@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class ProjectStats(Base):
+    """Rollup of a project's tasks, maintained by the task and module services."""
+    __tablename__ = "project_stats"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    todo = Column(Integer, nullable=False, default=0)
+    in_progress = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
+    blocked = Column(Integer, nullable=False, default=0)
+    progress_sum = Column(BigInteger, nullable=False, default=0)
+    # Bumped by every write to the project's tasks, modules or members; the ETag of its read endpoints
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ProjectMemberStats(Base):
+    """Per-assignee task counts of a project."""
+    __tablename__ = "project_member_stats"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, Integer, Enum, Date, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Text, Integer, Enum, Date, DateTime, ForeignKey, Index, DDL, event, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -33,6 +33,19 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_tasks_project_created", "project_id", "created_at", "id"),
+        Index("ix_tasks_project_status", "project_id", "status"),
+        Index("ix_tasks_project_assignee", "project_id", "assignee_id"),
+        Index("ix_tasks_project_due_date", "project_id", "due_date"),
+        Index("ix_tasks_assignee_status_due_date", "assignee_id", "status", "due_date"),
+        # Trigram indexes serve the substring search; they work for Chinese text,
+        # which a tsvector would need a word segmenter for.
+        Index("ix_tasks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_tasks_description_trgm", "description", postgresql_using="gin",
+              postgresql_ops={"description": "gin_trgm_ops"}),
+    )
+
     project = relationship("Project", back_populates="tasks")
     assignee = relationship("User", back_populates="assigned_tasks")
     logs = relationship("TaskLog", back_populates="task", cascade="all, delete-orphan")
@@ -49,5 +62,13 @@ class TaskLog(Base):
     status = Column(Enum(TaskStatus), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_task_logs_task_created", "task_id", "created_at", "id"),
+        Index("ix_task_logs_content_trgm", "content", postgresql_using="gin",
+              postgresql_ops={"content": "gin_trgm_ops"}),
+    )
+
     task = relationship("Task", back_populates="logs")
     user = relationship("User", back_populates="task_logs")
+
+event.listen(Task.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, Integer, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """An issued refresh token; each one can be exchanged once."""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)  # the token's jti
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    # The token this one was rotated into; unset when revoked by a logout
+    replaced_by = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class TokenRevocation(Base):
+    """Revoked access tokens: one token by ``jti``, or all of a user's below ``min_version``.
+
+    A row expires with the last token it covers; every worker mirrors the
+    unexpired rows in memory.
+    """
+    __tablename__ = "token_revocations"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    jti = Column(UUID(as_uuid=True), nullable=True)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    min_version = Column(Integer, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Enum, DateTime, func
+from sqlalchemy import Column, String, Integer, Enum, DateTime, Index, DDL, event, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -17,9 +17,23 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.member)
+    # Carried in access tokens; bumping it revokes every token issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_users_created", "created_at", "id"),
+        # Short queries match a prefix through the lower() indexes; longer ones
+        # any substring through the trigram indexes, Chinese names included.
+        Index("ix_users_name_prefix", text("lower(name) text_pattern_ops")),
+        Index("ix_users_email_prefix", text("lower(email) text_pattern_ops")),
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    )
+
     owned_projects = relationship("Project", back_populates="owner")
     project_memberships = relationship("ProjectMember", back_populates="user")
     assigned_tasks = relationship("Task", back_populates="assignee")
     task_logs = relationship("TaskLog", back_populates="user")
+
+event.listen(User.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -1,10 +1,13 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.auth import LoginRequest, TokenResponse
+from app.schemas.auth import LoginRequest, RefreshRequest, LogoutRequest, TokenResponse
 from app.schemas.user import UserOut
-from app.services.auth_service import authenticate_user, create_access_token
-from app.dependencies import get_current_user
+from app.services.auth_service import authenticate_user, get_cached_user
+from app.services.token_service import issue_tokens, rotate_refresh_token, logout as revoke_session
+from app.dependencies import get_current_user, optional_bearer_scheme
 from app.models.user import User
 
 router = APIRouter()
@@ -14,13 +17,23 @@ def login(body: LoginRequest, db: Session = Depends(get_db)):
     user = authenticate_user(db, body.email, body.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = create_access_token(user)
-    return TokenResponse(access_token=token, user_id=str(user.id), role=user.role.value, name=user.name)
+    tokens = issue_tokens(db, user)
+    db.commit()
+    return TokenResponse(**tokens, user_id=str(user.id), role=user.role.value, name=user.name)
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    user, tokens = rotate_refresh_token(db, body.refresh_token)
+    return TokenResponse(**tokens, user_id=str(user.id), role=user.role.value, name=user.name)
 
 @router.post("/logout")
-def logout():
+def logout(body: Optional[LogoutRequest] = None,
+           credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer_scheme),
+           db: Session = Depends(get_db)):
+    revoke_session(db, credentials.credentials if credentials else None, body.refresh_token if body else None)
     return {"message": "logged out"}
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
-    return current_user
+def me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # The token only carries what authorization needs; the profile comes from the user cache.
+    return get_cached_user(db, current_user.id)
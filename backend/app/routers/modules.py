@@ -1,37 +1,43 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.database import get_db
+from app.etag import not_modified, set_etag
 from app.dependencies import get_current_user, require_admin
 from app.models.user import User
 from app.schemas.module import ModuleCreate, ModuleUpdate, ModuleOut
 from app.services.module_service import list_modules, get_module_or_404, create_module, update_module, delete_module
-from app.services.project_service import get_project_or_403
+from app.services.project_service import check_project_access, project_etag
 
 router = APIRouter()
 
 
 @router.get("/projects/{project_id}/modules", response_model=list[ModuleOut])
-def get_modules(project_id: UUID, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    get_project_or_403(db, project_id, user)
+def get_modules(project_id: UUID, request: Request, response: Response,
+                db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    check_project_access(db, project_id, user)
+    etag = project_etag(db, project_id, "modules")
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
     return list_modules(db, project_id)
 
 
 @router.post("/projects/{project_id}/modules", response_model=ModuleOut, status_code=201)
 def create(project_id: UUID, body: ModuleCreate, db: Session = Depends(get_db), user: User = Depends(require_admin)):
-    get_project_or_403(db, project_id, user)
+    check_project_access(db, project_id, user)
     return create_module(db, project_id, body)
 
 
 @router.patch("/modules/{module_id}", response_model=ModuleOut)
 def update(module_id: UUID, body: ModuleUpdate, db: Session = Depends(get_db), user: User = Depends(require_admin)):
     module = get_module_or_404(db, module_id)
-    get_project_or_403(db, module.project_id, user)
+    check_project_access(db, module.project_id, user)
     return update_module(db, module, body)
 
 
 @router.delete("/modules/{module_id}", status_code=204)
 def delete(module_id: UUID, db: Session = Depends(get_db), user: User = Depends(require_admin)):
     module = get_module_or_404(db, module_id)
-    get_project_or_403(db, module.project_id, user)
+    check_project_access(db, module.project_id, user)
     delete_module(db, module)
@@ -1,27 +1,86 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import StreamingResponse
-from io import BytesIO
+import os
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from urllib.parse import quote
 from sqlalchemy.orm import Session
 from uuid import UUID
+from typing import Optional
 from app.database import get_db
+from app.etag import not_modified, set_etag
 from app.dependencies import get_current_user, require_admin
 from app.models.user import User
-from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectOut, MemberAdd
+from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectOut, MemberAdd, ProjectEventOut
 from app.schemas.user import UserOut
+from app.schemas.export import ExportJobOut
 from app.services.project_service import (
-    get_accessible_projects, get_project_or_403,
+    get_accessible_projects, get_project_or_403, check_project_access,
     create_project, update_project, delete_project,
     add_member, remove_member, get_project_members,
-    get_project_stats,
+    get_project_stats, accessible_projects_etag, project_etag,
+)
+from app.services.event_service import list_events, stream_start, stream_events
+from app.services.export_service import stream_excel, iter_file
+from app.services.export_job_service import (
+    submit_export, get_export_job_or_404, cached_export_path, export_path, ExportJobStatus,
 )
-from app.services.export_service import generate_excel
 
 router = APIRouter()
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _export_filename(project) -> str:
+    return f"attachment; filename*=UTF-8''{quote(project.name)}-report.xlsx"
+
+
+def _file_response(request: Request, path: str, headers: dict) -> Response:
+    """Serve a file, honouring a single-range ``Range: bytes=`` request."""
+    size = os.path.getsize(path)
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+    if not range_header:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(iter_file(open(path, "rb")), media_type=XLSX_MEDIA_TYPE, headers=headers)
+
+    try:
+        unit, _, spec = range_header.partition("=")
+        start_s, _, end_s = spec.strip().partition("-")
+        if unit.strip() != "bytes" or "," in spec:
+            raise ValueError
+        if start_s:
+            start, end = int(start_s), int(end_s) if end_s else size - 1
+        else:
+            start, end = max(size - int(end_s), 0), size - 1
+        end = min(end, size - 1)
+        if start > end:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=416, detail="Invalid range",
+                            headers={"Content-Range": f"bytes */{size}"})
+
+    def body():
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(body(), status_code=206, media_type=XLSX_MEDIA_TYPE, headers=headers)
+
 
 @router.get("", response_model=list[ProjectOut])
-def list_projects(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_projects(request: Request, response: Response,
+                  db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    etag = accessible_projects_etag(db, user)
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
     return get_accessible_projects(db, user)
 
 
@@ -49,7 +108,7 @@ def update(project_id: UUID, body: ProjectUpdate, db: Session = Depends(get_db),
 
 @router.get("/{project_id}/members", response_model=list[UserOut])
 def list_members(project_id: UUID, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    get_project_or_403(db, project_id, user)
+    check_project_access(db, project_id, user)
     return get_project_members(db, project_id)
 
 
@@ -67,17 +126,65 @@ def remove(project_id: UUID, user_id: UUID, db: Session = Depends(get_db), user:
 
 
 @router.get("/{project_id}/stats")
-def stats(project_id: UUID, db: Session = Depends(get_db), user: User = Depends(require_admin)):
-    get_project_or_403(db, project_id, user)
+def stats(project_id: UUID, request: Request, response: Response,
+          db: Session = Depends(get_db), user: User = Depends(require_admin)):
+    check_project_access(db, project_id, user)
+    etag = project_etag(db, project_id, "stats")
+    if cached := not_modified(request, etag):
+        return cached
+    set_etag(response, etag)
     return get_project_stats(db, project_id)
 
 
+@router.get("/{project_id}/events", response_model=list[ProjectEventOut])
+def events(project_id: UUID, since: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=500),
+           db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    """Catch up on the change feed after sequence number ``since``; 410 when it is too old."""
+    check_project_access(db, project_id, user)
+    return list_events(db, project_id, since, limit)
+
+
+@router.get("/{project_id}/events/stream")
+def event_stream(project_id: UUID, since: Optional[int] = Query(None, ge=0),
+                 last_event_id: Optional[int] = Header(None),
+                 db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    """Server-sent change events, replayed from ``since`` (or Last-Event-ID on reconnect)."""
+    check_project_access(db, project_id, user)
+    after = stream_start(db, since if since is not None else last_event_id)
+    return StreamingResponse(stream_events(project_id, after), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @router.get("/{project_id}/export")
-def export(project_id: UUID, db: Session = Depends(get_db), user: User = Depends(require_admin)):
+def export(project_id: UUID, request: Request, db: Session = Depends(get_db), user: User = Depends(require_admin)):
+    project = get_project_or_403(db, project_id, user)
+    headers = {"Content-Disposition": _export_filename(project)}
+    cached = cached_export_path(db, project)
+    if cached:
+        return _file_response(request, cached, headers)
+    return StreamingResponse(stream_excel(db, project), media_type=XLSX_MEDIA_TYPE, headers=headers)
+
+
+@router.post("/{project_id}/exports", response_model=ExportJobOut, status_code=202)
+def create_export(project_id: UUID, db: Session = Depends(get_db), user: User = Depends(require_admin)):
+    project = get_project_or_403(db, project_id, user)
+    return submit_export(db, project)
+
+
+@router.get("/{project_id}/exports/{job_id}", response_model=ExportJobOut)
+def export_status(project_id: UUID, job_id: str, db: Session = Depends(get_db), user: User = Depends(require_admin)):
+    check_project_access(db, project_id, user)
+    return get_export_job_or_404(project_id, job_id)
+
+
+@router.get("/{project_id}/exports/{job_id}/download")
+def download_export(project_id: UUID, job_id: str, request: Request,
+                    db: Session = Depends(get_db), user: User = Depends(require_admin)):
     project = get_project_or_403(db, project_id, user)
-    content = generate_excel(db, project)
-    return StreamingResponse(
-        BytesIO(content),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(project.name)}-report.xlsx"}
-    )
+    job = get_export_job_or_404(project_id, job_id)
+    if job.status != ExportJobStatus.done:
+        raise HTTPException(status_code=409, detail=f"Export is {job.status.value}")
+    path = export_path(project_id, job.id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Export expired")
+    return _file_response(request, path, {"Content-Disposition": _export_filename(project)})
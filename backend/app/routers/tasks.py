@@ -1,30 +1,142 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
+from datetime import date
+from typing import Optional
 from app.database import get_db
+from app.etag import not_modified, etag_headers
 from app.dependencies import get_current_user, require_admin
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskLogCreate, TaskLogOut
+from app.models.task import TaskStatus, TaskPriority
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskOut, TaskLogCreate, TaskLogOut, TaskFilter, AssigneeOut, ModuleRef,
+    TaskBulkIn, TaskBulkResult, TaskBatchUpdate, TaskBatchResult, TaskSearchHit,
+)
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 from app.services.task_service import (
-    get_task_or_403, list_tasks, create_task, update_task, delete_task, create_log, list_logs
+    get_task_or_403, list_tasks, create_task, update_task, delete_task, create_log, list_logs,
+    bulk_upsert_tasks, batch_update_tasks, search_tasks, list_my_tasks,
 )
-from app.services.project_service import get_project_or_403
+from app.services.import_service import import_tasks
+from app.services.project_service import check_project_access, project_etag
 
 router = APIRouter()
 
+_NESTED_FIELDS = {"assignee": AssigneeOut, "module": ModuleRef}
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[list[str]]:
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in TaskOut.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [f for f in names if f != "id"]
+
+
+def _sparse_task(task, fields: list[str]) -> dict:
+    data = {}
+    for f in fields:
+        value = getattr(task, f)
+        if f in _NESTED_FIELDS and value is not None:
+            value = _NESTED_FIELDS[f].model_validate(value)
+        data[f] = value
+    return data
+
 
 @router.get("/projects/{project_id}/tasks", response_model=list[TaskOut])
-def get_tasks(project_id: UUID, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    get_project_or_403(db, project_id, user)
-    return list_tasks(db, project_id)
+def get_tasks(
+    project_id: UUID,
+    request: Request,
+    response: Response,
+    status: Optional[list[TaskStatus]] = Query(None),
+    priority: Optional[list[TaskPriority]] = Query(None),
+    assignee_id: Optional[UUID] = None,
+    module_id: Optional[UUID] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated TaskOut fields to return"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    check_project_access(db, project_id, user)
+    etag = project_etag(db, project_id, "tasks", request.url.query)
+    if cached := not_modified(request, etag):
+        return cached
+    filters = TaskFilter(status=status, priority=priority, assignee_id=assignee_id,
+                         module_id=module_id, due_from=due_from, due_to=due_to)
+    field_list = _parse_fields(fields)
+    tasks = list_tasks(
+        db, project_id, filters,
+        limit=limit + 1 if limit else None,
+        after=decode_cursor(cursor) if cursor else None,
+        fields=field_list,
+    )
+    headers = etag_headers(etag)
+    if limit and len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+    if field_list is not None:
+        return JSONResponse(jsonable_encoder([_sparse_task(t, field_list) for t in tasks]), headers=headers)
+    response.headers.update(headers)
+    return tasks
+
+
+@router.get("/me/tasks", response_model=list[TaskOut])
+def get_my_tasks(
+    status: Optional[list[TaskStatus]] = Query(None),
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    return list_my_tasks(db, user, status=status, due_from=due_from, due_to=due_to, limit=limit, offset=offset)
+
+
+@router.get("/tasks/search", response_model=list[TaskSearchHit])
+def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    project_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    rows = search_tasks(db, user, q, project_id=project_id, limit=limit, offset=offset)
+    return [TaskSearchHit(**TaskOut.model_validate(task).model_dump(), rank=rank) for task, rank in rows]
 
 
 @router.post("/projects/{project_id}/tasks", response_model=TaskOut, status_code=201)
 def create(project_id: UUID, body: TaskCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    get_project_or_403(db, project_id, user)
+    check_project_access(db, project_id, user)
     return create_task(db, project_id, body, user)
 
 
+@router.post("/projects/{project_id}/tasks/bulk", response_model=TaskBulkResult)
+def bulk_upsert(project_id: UUID, body: TaskBulkIn, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    check_project_access(db, project_id, user)
+    return bulk_upsert_tasks(db, project_id, body.tasks, user)
+
+
+@router.patch("/projects/{project_id}/tasks", response_model=TaskBatchResult)
+def batch_update(project_id: UUID, body: TaskBatchUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    check_project_access(db, project_id, user)
+    return batch_update_tasks(db, project_id, body, user)
+
+
+@router.post("/projects/{project_id}/tasks/import", response_model=TaskBulkResult)
+def import_file(project_id: UUID, file: UploadFile = File(...), db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    check_project_access(db, project_id, user)
+    return import_tasks(db, project_id, file.filename or "", file.file.read(), user)
+
+
 @router.delete("/tasks/{task_id}", status_code=204)
 def delete(task_id: UUID, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
     task = get_task_or_403(db, task_id, user)
@@ -38,9 +150,16 @@ def update(task_id: UUID, body: TaskUpdate, db: Session = Depends(get_db), user:
 
 
 @router.get("/tasks/{task_id}/logs", response_model=list[TaskLogOut])
-def get_logs(task_id: UUID, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_logs(
+    task_id: UUID,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    before: Optional[UUID] = Query(None, description="Return logs older than this log id"),
+    since: Optional[UUID] = Query(None, description="Return logs newer than this log id"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
     get_task_or_403(db, task_id, user)
-    return list_logs(db, task_id)
+    return list_logs(db, task_id, limit=limit, before=before, since=since)
 
 
 @router.post("/tasks/{task_id}/logs", response_model=TaskLogOut, status_code=201)
@@ -1,18 +1,47 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile
 from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import Optional
 from app.database import get_db
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 from app.dependencies import require_admin
-from app.schemas.user import UserCreate, UserOut
-from app.services.user_service import create_user, get_all_users
+from app.models.user import User
+from app.schemas.user import UserCreate, UserOut, UserBulkIn, UserBulkResult
+from app.services.user_service import create_user, list_users, bulk_create_users
+from app.services.import_service import import_users
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[UserOut])
-def list_users(db: Session = Depends(get_db), _=Depends(require_admin)):
-    return get_all_users(db)
+def directory(
+    response: Response,
+    q: Optional[str] = Query(None, max_length=100, description="Matches name or email"),
+    exclude_project_id: Optional[UUID] = Query(None, description="Leave out members of this project"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    _=Depends(require_admin),
+):
+    users = list_users(db, q=q.strip() if q else None, exclude_project_id=exclude_project_id,
+                       limit=limit + 1, after=decode_cursor(cursor) if cursor else None)
+    if len(users) > limit:
+        users = users[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(users[-1].created_at, users[-1].id)
+    return users
 
 
 @router.post("", response_model=UserOut, status_code=201)
 def create(body: UserCreate, db: Session = Depends(get_db), _=Depends(require_admin)):
     return create_user(db, body)
+
+
+@router.post("/bulk", response_model=UserBulkResult, status_code=201)
+def bulk_create(body: UserBulkIn, db: Session = Depends(get_db), user: User = Depends(require_admin)):
+    return bulk_create_users(db, body.users, user, body.project_ids)
+
+
+@router.post("/import", response_model=UserBulkResult, status_code=201)
+def import_file(file: UploadFile = File(...), project_ids: list[UUID] = Query([]),
+                db: Session = Depends(get_db), user: User = Depends(require_admin)):
+    return import_users(db, file.filename or "", file.file.read(), user, project_ids)
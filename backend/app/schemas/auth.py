@@ -1,11 +1,21 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
+    # Lifetime of the access token in seconds
+    expires_in: int
     token_type: str = "bearer"
     user_id: str
     role: str
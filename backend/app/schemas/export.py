@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+from app.services.export_job_service import ExportJobStatus
+
+
+class ExportJobOut(BaseModel):
+    id: str
+    project_id: UUID
+    status: ExportJobStatus
+    error: Optional[str]
+    created_at: datetime
+    model_config = {"from_attributes": True}
@@ -30,3 +30,12 @@ class ProjectOut(BaseModel):
 
 class MemberAdd(BaseModel):
     user_id: UUID
+
+
+class ProjectEventOut(BaseModel):
+    id: int
+    kind: str
+    payload: dict
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
 from datetime import datetime, date
 from typing import Optional
@@ -26,6 +26,60 @@ class TaskUpdate(BaseModel):
     due_date: Optional[date] = None
 
 
+class TaskBulkItem(TaskCreate):
+    # Set to update that task (or create it with this id); omit to create a new one
+    id: Optional[UUID] = None
+    # Required when the item creates a task; may be omitted but not null
+    title: Optional[str] = None
+    status: TaskStatus = TaskStatus.todo
+    progress: int = Field(0, ge=0, le=100)
+
+    @field_validator("title")
+    @classmethod
+    def title_not_null(cls, value):
+        # Only runs for a title that was given: an explicit null would reach
+        # the NOT NULL column of an updated task.
+        if value is None:
+            raise ValueError("title cannot be null")
+        return value
+
+
+class TaskBulkIn(BaseModel):
+    tasks: list[TaskBulkItem] = Field(..., min_length=1, max_length=5000)
+
+
+class TaskBulkResult(BaseModel):
+    created: int
+    updated: int
+    # Task ids in input order
+    ids: list[UUID]
+
+
+class TaskFilter(BaseModel):
+    status: Optional[list[TaskStatus]] = None
+    priority: Optional[list[TaskPriority]] = None
+    assignee_id: Optional[UUID] = None
+    module_id: Optional[UUID] = None
+    due_from: Optional[date] = None
+    due_to: Optional[date] = None
+
+
+class TaskBatchUpdate(BaseModel):
+    # Select the tasks either by id or by filter
+    ids: Optional[list[UUID]] = Field(None, min_length=1, max_length=5000)
+    filter: Optional[TaskFilter] = None
+    changes: TaskUpdate
+    # Content of a progress log written to every updated task
+    log: Optional[str] = None
+
+
+class TaskBatchResult(BaseModel):
+    updated: int
+    ids: list[UUID]
+    # Requested ids that are not tasks of the project
+    missing: list[UUID] = []
+
+
 class TaskLogCreate(BaseModel):
     content: str
     progress: int = Field(..., ge=0, le=100)
@@ -69,3 +123,7 @@ class TaskOut(BaseModel):
     assignee: Optional[AssigneeOut]
     module: Optional[ModuleRef]
     model_config = {"from_attributes": True}
+
+
+class TaskSearchHit(TaskOut):
+    rank: float
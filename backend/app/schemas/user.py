@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID
 from datetime import datetime
 from app.models.user import UserRole
@@ -17,3 +17,19 @@ class UserOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class UserBulkItem(UserCreate):
+    # Projects the user joins as a member, besides UserBulkIn.project_ids
+    project_ids: list[UUID] = []
+
+class UserBulkIn(BaseModel):
+    users: list[UserBulkItem] = Field(..., min_length=1, max_length=5000)
+    # Projects every created user joins
+    project_ids: list[UUID] = []
+
+class UserBulkResult(BaseModel):
+    created: int
+    # User ids in input order
+    ids: list[UUID]
+    memberships: int
@@ -1,26 +1,167 @@
-from datetime import datetime, timedelta, timezone
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from typing import Optional
-from jose import jwt
+from uuid import UUID
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.config import settings
+from app.cache import cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below the configured cost are re-hashed on the next successful login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto",
+                           bcrypt__rounds=settings.password_bcrypt_rounds,
+                           bcrypt__min_rounds=settings.password_bcrypt_rounds)
 
-def hash_password(password: str) -> str:
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(settings.password_hash_queue_limit, 1))
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
 
-def create_access_token(user: User) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-    data = {"sub": str(user.id), "role": user.role.value, "exp": expire}
-    return jwt.encode(data, settings.secret_key, algorithm="HS256")
+def _verify_and_update(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _drop_executor(broken: ProcessPoolExecutor) -> None:
+    # A pool whose child died (e.g. OOM-killed) fails every later call; the
+    # next call starts a fresh one.
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(fns: list[tuple]) -> list:
+    """Run ``(fn, *args)`` calls in the hashing processes and return their results.
+
+    Retried once in a new pool if the current one is broken.
+    """
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            futures = [executor.submit(fn, *args) for fn, *args in fns]
+            return [f.result() for f in futures]
+        except BrokenProcessPool:
+            _drop_executor(executor)
+            if attempt:
+                raise
+
+
+def _acquire_slots(n: int, blocking: bool = False) -> None:
+    for taken in range(n):
+        if not _slots.acquire(blocking=blocking):
+            for _ in range(taken):
+                _slots.release()
+            raise HTTPException(status_code=503, detail="Too many logins in progress, retry shortly",
+                                headers={"Retry-After": "1"})
+
+
+def _run_hashing(fn, *args):
+    """Run a bcrypt call in the hashing processes, off the request threads' CPU.
+
+    At most ``password_hash_queue_limit`` calls may be queued or running; beyond
+    that the request fails at once with 503 rather than waiting behind the spike.
+    """
+    if settings.password_hash_workers <= 0:
+        return fn(*args)
+    _acquire_slots(1)
+    try:
+        return _submit([(fn, *args)])[0]
+    finally:
+        _slots.release()
+
+
+def shutdown_hashing() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def hash_password(password: str) -> str:
+    return _run_hashing(_hash, password)
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash many passwords across the hashing processes, for bulk provisioning.
+
+    Work is submitted one window of ``password_hash_workers`` hashes at a time,
+    each waiting for and holding queue slots, so logins arriving meanwhile queue
+    behind one window rather than the batch, and still get a 503 when full.
+    """
+    workers = settings.password_hash_workers
+    if workers <= 0:
+        return [_hash(p) for p in passwords]
+    window = max(min(workers, settings.password_hash_queue_limit // 2), 1)
+    hashes = []
+    for i in range(0, len(passwords), window):
+        batch = passwords[i:i + window]
+        _acquire_slots(len(batch), blocking=True)
+        try:
+            hashes.extend(_submit([(_hash, p) for p in batch]))
+        finally:
+            for _ in batch:
+                _slots.release()
+    return hashes
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return _run_hashing(_verify_and_update, plain, hashed)[0]
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
+    if not user:
+        return None
+    valid, new_hash = _run_hashing(_verify_and_update, password, user.password_hash)
+    if not valid:
         return None
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
     return user
+
+
+def _user_key(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def get_cached_user(db: Session, user_id: UUID) -> Optional[User]:
+    """Load the authenticated user, served from the principal cache when possible.
+
+    Cache hits return a transient ``User`` carrying the public columns only;
+    it is never attached to the session.
+    """
+    data = cache.get(_user_key(user_id))
+    if data is not None:
+        return User(
+            id=UUID(data["id"]), name=data["name"], email=data["email"],
+            role=UserRole(data["role"]), created_at=datetime.fromisoformat(data["created_at"]),
+        )
+    user = db.query(User).filter(User.id == user_id).first()
+    if user:
+        cache.set(_user_key(user_id), {
+            "id": str(user.id), "name": user.name, "email": user.email,
+            "role": user.role.value, "created_at": user.created_at.isoformat(),
+        }, settings.auth_cache_ttl_seconds)
+    return user
+
+
+def invalidate_user(user_id) -> None:
+    cache.delete(_user_key(user_id))
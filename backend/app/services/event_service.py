@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import AsyncSessionLocal, get_async_engine
+from app.models.event import ProjectEvent
+from app.services.stats_service import bump_project_version
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "project_events"
+# Events returned per query, both for replay and for live delivery.
+EVENT_PAGE_SIZE = 500
+
+
+def record_event(db: Session, project_id: UUID, kind: str, **payload) -> None:
+    """Bump the project's version and append an event to its feed; the caller commits.
+
+    The version bump locks the project's stats row first, so event ids of one
+    project are allocated in commit order and a replay can never skip one that
+    commits late. The NOTIFY is delivered only if the transaction commits.
+    """
+    bump_project_version(db, project_id)
+    db.execute(insert(ProjectEvent).values(project_id=project_id, kind=kind, payload=jsonable_encoder(payload)))
+    db.execute(select(func.pg_notify(CHANNEL, str(project_id))))
+
+
+def _events_stmt(project_id: UUID, since: int, limit: int):
+    return (select(ProjectEvent)
+              .where(ProjectEvent.project_id == project_id, ProjectEvent.id > since)
+              .order_by(ProjectEvent.id)
+              .limit(limit))
+
+
+def _check_replayable(oldest: Optional[int], since: int) -> None:
+    # Ids are one sequence for all projects, trimmed by age: anything before the
+    # oldest kept id may have been dropped, so the client has to reload.
+    if since and oldest is not None and since < oldest - 1:
+        raise HTTPException(status_code=410, detail="Events since this sequence number are no longer kept")
+
+
+def list_events(db: Session, project_id: UUID, since: int = 0, limit: int = EVENT_PAGE_SIZE) -> list[ProjectEvent]:
+    _check_replayable(db.scalar(select(func.min(ProjectEvent.id))), since)
+    return list(db.scalars(_events_stmt(project_id, since, limit)))
+
+
+def stream_start(db: Session, since: Optional[int]) -> int:
+    """The sequence number a stream resumes after: ``since``, or the newest event for a fresh stream."""
+    if since is None:
+        return db.scalar(select(func.max(ProjectEvent.id))) or 0
+    _check_replayable(db.scalar(select(func.min(ProjectEvent.id))), since)
+    return since
+
+
+def trim_events(db: Session) -> None:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.event_retention_hours)
+    db.execute(delete(ProjectEvent).where(ProjectEvent.created_at < cutoff).execution_options(synchronize_session=False))
+    db.commit()
+
+
+class Broadcaster:
+    """Wakes the streams of a project in this worker when its feed changes.
+
+    Only a wake-up is broadcast; each stream reads the events from the table,
+    so a missed or coalesced notification costs latency, never an event.
+    """
+
+    def __init__(self):
+        self._queues: dict[UUID, set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, project_id: UUID) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self._queues[project_id].add(queue)
+        return queue
+
+    def unsubscribe(self, project_id: UUID, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(project_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._queues[project_id]
+
+    def publish(self, project_id: UUID) -> None:
+        for queue in self._queues.get(project_id, ()):
+            if queue.empty():
+                queue.put_nowait(None)
+
+
+broadcaster = Broadcaster()
+_listener: Optional[asyncio.Task] = None
+
+
+def _on_notify(connection, pid, channel, payload: str) -> None:
+    try:
+        broadcaster.publish(UUID(payload))
+    except ValueError:
+        pass
+
+
+async def _listen() -> None:
+    # One LISTEN connection per worker, outside the pool; NOTIFYs from every
+    # worker's commits arrive here and fan out to the local streams.
+    while True:
+        try:
+            async with get_async_engine().connect() as conn:
+                raw = (await conn.get_raw_connection()).driver_connection
+                await raw.add_listener(CHANNEL, _on_notify)
+                while not raw.is_closed():
+                    await asyncio.sleep(settings.event_heartbeat_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Listening for project events failed; retrying")
+        await asyncio.sleep(settings.event_heartbeat_seconds)
+
+
+def _ensure_listener() -> None:
+    global _listener
+    # Transaction-mode pgbouncer drops LISTEN; streams then poll every heartbeat.
+    if settings.db_pgbouncer or (_listener is not None and not _listener.done()):
+        return
+    _listener = asyncio.get_running_loop().create_task(_listen())
+
+
+async def stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
+
+
+def _sse(event: ProjectEvent) -> str:
+    data = json.dumps({"id": event.id, "kind": event.kind, "payload": event.payload,
+                       "created_at": event.created_at.isoformat()}, ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n"
+
+
+async def _fetch(project_id: UUID, since: int) -> list[ProjectEvent]:
+    async with AsyncSessionLocal() as db:
+        return list(await db.scalars(_events_stmt(project_id, since, EVENT_PAGE_SIZE)))
+
+
+async def stream_events(project_id: UUID, after: int) -> AsyncIterator[str]:
+    """Server-sent events of a project with ids above ``after``, until the client goes away.
+
+    Subscribes before the first read, so nothing committed in between is lost.
+    """
+    _ensure_listener()
+    queue = broadcaster.subscribe(project_id)
+    try:
+        yield f"retry: {int(settings.event_heartbeat_seconds * 1000)}\n\n"
+        while True:
+            events = await _fetch(project_id, after)
+            for event in events:
+                yield _sse(event)
+                after = event.id
+            if len(events) == EVENT_PAGE_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(queue.get(), settings.event_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(project_id, queue)
@@ -0,0 +1,139 @@
+import enum
+import glob
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import String, func, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models.module import Module, in_deleted_module
+from app.models.task import Task, TaskLog
+from app.models.user import User
+from app.services.export_service import write_excel
+from app.services.stats_service import project_version
+
+
+class ExportJobStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+@dataclass
+class ExportJob:
+    # The id is the cache key, so any worker sharing the cache directory can
+    # answer for a finished job even if another worker ran it.
+    id: str
+    project_id: UUID
+    status: ExportJobStatus
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+_executor = ThreadPoolExecutor(max_workers=settings.export_workers, thread_name_prefix="export")
+_jobs: dict[str, ExportJob] = {}
+_lock = threading.Lock()
+_JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def export_cache_key(db: Session, project: Project) -> str:
+    """Fingerprint of everything that ends up in the workbook."""
+    live = ~in_deleted_module(Task.module_id)
+    tasks = (db.query(func.count(Task.id), func.max(Task.updated_at))
+               .filter(Task.project_id == project.id, live).one())
+    logs = (db.query(func.count(TaskLog.id), func.max(TaskLog.created_at))
+              .join(Task, Task.id == TaskLog.task_id)
+              .filter(Task.project_id == project.id, live).one())
+    modules = (db.query(func.count(Module.id), func.max(Module.created_at))
+                 .filter(Module.project_id == project.id, Module.deleted_at.is_(None)).one())
+    # The version changes on every write to the project, module renames and
+    # reorders included; user names are not project writes, so they are
+    # fingerprinted for the assignees and log authors the workbook names.
+    users = db.scalar(
+        select(func.md5(func.string_agg(User.id.cast(String) + ":" + User.name, aggregate_order_by(",", User.id))))
+        .where(or_(User.id.in_(select(Task.assignee_id).where(Task.project_id == project.id)),
+                   User.id.in_(select(TaskLog.user_id).join(Task, Task.id == TaskLog.task_id)
+                                 .where(Task.project_id == project.id)))))
+    parts = [project.id, project.updated_at, project_version(db, project.id), users, *tasks, *logs, *modules]
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+
+def export_path(project_id: UUID, job_id: str) -> str:
+    return os.path.join(settings.export_cache_dir, f"{project_id}-{job_id}.xlsx")
+
+
+def cached_export_path(db: Session, project: Project) -> Optional[str]:
+    path = export_path(project.id, export_cache_key(db, project))
+    return path if os.path.exists(path) else None
+
+
+def _run_export(job: ExportJob) -> None:
+    job.status = ExportJobStatus.running
+    path = export_path(job.project_id, job.id)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    db = SessionLocal()
+    try:
+        project = db.query(Project).filter(Project.id == job.project_id, Project.deleted_at.is_(None)).first()
+        if not project:
+            raise RuntimeError("Project not found")
+        with open(tmp_path, "wb") as f:
+            write_excel(db, project, f)
+        os.replace(tmp_path, path)
+        # Older snapshots of this project can never be requested again.
+        for stale in glob.glob(export_path(job.project_id, "*")):
+            if stale != path:
+                os.remove(stale)
+        job.status = ExportJobStatus.done
+    except Exception as e:
+        job.status = ExportJobStatus.failed
+        job.error = str(e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    finally:
+        db.close()
+
+
+def submit_export(db: Session, project: Project) -> ExportJob:
+    os.makedirs(settings.export_cache_dir, exist_ok=True)
+    job_id = export_cache_key(db, project)
+    with _lock:
+        job = _jobs.get(job_id)
+        if job and job.status != ExportJobStatus.failed:
+            return job
+        if os.path.exists(export_path(project.id, job_id)):
+            job = ExportJob(id=job_id, project_id=project.id, status=ExportJobStatus.done)
+            _jobs[job_id] = job
+            return job
+        active = sum(1 for j in _jobs.values()
+                     if j.status in (ExportJobStatus.pending, ExportJobStatus.running))
+        if active >= settings.export_queue_limit:
+            raise HTTPException(status_code=429, detail="Too many exports in progress")
+        # Forget finished jobs; their files stay in the cache directory.
+        for key in [k for k, j in _jobs.items() if j.status == ExportJobStatus.done]:
+            del _jobs[key]
+        job = ExportJob(id=job_id, project_id=project.id, status=ExportJobStatus.pending)
+        _jobs[job_id] = job
+    _executor.submit(_run_export, job)
+    return job
+
+
+def get_export_job_or_404(project_id: UUID, job_id: str) -> ExportJob:
+    if not _JOB_ID_RE.fullmatch(job_id):
+        raise HTTPException(status_code=404, detail="Export job not found")
+    job = _jobs.get(job_id)
+    if job and job.project_id == project_id:
+        return job
+    if os.path.exists(export_path(project_id, job_id)):
+        return ExportJob(id=job_id, project_id=project_id, status=ExportJobStatus.done)
+    raise HTTPException(status_code=404, detail="Export job not found")
@@ -1,11 +1,15 @@
-from io import BytesIO
+from tempfile import TemporaryFile
+from typing import BinaryIO, Iterator
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.project import Project
-from app.models.module import Module
-from app.models.task import Task, TaskLog
+from app.models.module import Module, in_deleted_module
+from app.models.task import Task, TaskLog, TaskStatus
+from app.models.user import User
 
 STATUS_LABELS = {
     "todo": "待办",
@@ -21,6 +25,11 @@ PRIORITY_LABELS = {
     "urgent": "紧急",
 }
 
+# Rows fetched per round trip; with psycopg2 this runs on a server-side cursor.
+EXPORT_YIELD_PER = 1000
+# Size of the chunks handed to StreamingResponse.
+EXPORT_CHUNK_SIZE = 64 * 1024
+
 HEADER_FILL = PatternFill(fill_type="solid", fgColor="1E293B")
 HEADER_FONT = Font(bold=True, color="FFFFFF", size=10)
 BORDER_SIDE = Side(style="thin", color="E2E8F0")
@@ -29,24 +38,44 @@ CELL_BORDER = Border(
     top=BORDER_SIDE, bottom=BORDER_SIDE,
 )
 
+HEADER_STYLE = "kf_header"
+ROW_STYLE = "kf_row"
+ROW_ALT_STYLE = "kf_row_alt"
+
+
+def _register_styles(wb: Workbook) -> None:
+    # Named styles are written once into styles.xml and referenced by index
+    # from every cell, instead of one Fill/Alignment object per row.
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = HEADER_FONT
+    header.fill = HEADER_FILL
+    header.alignment = Alignment(horizontal="center", vertical="center")
+    header.border = CELL_BORDER
+    wb.add_named_style(header)
+
+    for name, bg in ((ROW_STYLE, "FFFFFF"), (ROW_ALT_STYLE, "F8FAFC")):
+        style = NamedStyle(name=name)
+        style.fill = PatternFill(fill_type="solid", fgColor=bg)
+        style.border = CELL_BORDER
+        style.alignment = Alignment(vertical="center", wrap_text=True)
+        wb.add_named_style(style)
+
+
+def _styled_row(ws, values: list, style: str) -> list:
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        cells.append(cell)
+    return cells
 
-def _style_header_row(ws, row: int, col_count: int):
-    for col in range(1, col_count + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.font = HEADER_FONT
-        cell.fill = HEADER_FILL
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = CELL_BORDER
 
+def _append_header(ws, headers: list[str]) -> None:
+    ws.append(_styled_row(ws, headers, HEADER_STYLE))
 
-def _style_data_row(ws, row: int, col_count: int, alt: bool = False):
-    bg = "F8FAFC" if alt else "FFFFFF"
-    fill = PatternFill(fill_type="solid", fgColor=bg)
-    for col in range(1, col_count + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.fill = fill
-        cell.border = CELL_BORDER
-        cell.alignment = Alignment(vertical="center", wrap_text=True)
+
+def _append_data(ws, row: int, values: list) -> None:
+    ws.append(_styled_row(ws, values, ROW_ALT_STYLE if row % 2 == 0 else ROW_STYLE))
 
 
 def _set_col_widths(ws, widths: list[int]):
@@ -54,26 +83,72 @@ def _set_col_widths(ws, widths: list[int]):
         ws.column_dimensions[get_column_letter(i)].width = w
 
 
-def generate_excel(db: Session, project: Project) -> bytes:
-    wb = Workbook()
+def _new_sheet(wb: Workbook, title: str, widths: list[int]):
+    ws = wb.create_sheet(title)
+    # Write-only sheets take dimensions before the first row is appended.
+    _set_col_widths(ws, widths)
+    ws.row_dimensions[1].height = 22
+    return ws
 
-    modules = db.query(Module).filter(Module.project_id == project.id).order_by(Module.order).all()
-    module_name_map = {str(m.id): m.name for m in modules}
 
-    tasks = db.query(Task).filter(Task.project_id == project.id).all()
-    total = len(tasks)
-    done = sum(1 for t in tasks if t.status.value == "done")
-    blocked = sum(1 for t in tasks if t.status.value == "blocked")
-    in_progress = sum(1 for t in tasks if t.status.value == "in_progress")
+def _task_rows(db: Session, project_id):
+    """All tasks of a project with assignee and module names, in a single query."""
+    return (
+        db.query(
+            Task.title, Task.description, Task.status, Task.priority, Task.progress,
+            Task.due_date, Task.created_at, Task.updated_at,
+            User.name.label("assignee_name"), Module.name.label("module_name"),
+        )
+        .outerjoin(User, User.id == Task.assignee_id)
+        .outerjoin(Module, Module.id == Task.module_id)
+        .filter(Task.project_id == project_id, Module.deleted_at.is_(None))
+        .order_by(Task.created_at, Task.id)
+        .yield_per(EXPORT_YIELD_PER)
+    )
+
+
+def _log_rows(db: Session, project_id):
+    """All logs of a project, grouped by task in task order, in a single query."""
+    return (
+        db.query(
+            Task.title, User.name.label("user_name"), TaskLog.status,
+            TaskLog.progress, TaskLog.content, TaskLog.created_at,
+        )
+        .join(Task, Task.id == TaskLog.task_id)
+        .join(User, User.id == TaskLog.user_id)
+        .filter(Task.project_id == project_id, ~in_deleted_module(Task.module_id))
+        .order_by(Task.created_at, Task.id, TaskLog.created_at)
+        .yield_per(EXPORT_YIELD_PER)
+    )
+
+
+def write_excel(db: Session, project: Project, fileobj: BinaryIO) -> None:
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+
+    modules = db.query(Module.id, Module.name).filter(
+        Module.project_id == project.id, Module.deleted_at.is_(None)).order_by(Module.order).all()
+
+    status_counts = dict(
+        db.query(Task.status, func.count(Task.id))
+        .filter(Task.project_id == project.id, ~in_deleted_module(Task.module_id))
+        .group_by(Task.status)
+        .all()
+    )
+    module_counts = dict(
+        db.query(Task.module_id, func.count(Task.id))
+        .filter(Task.project_id == project.id, Task.module_id.isnot(None), ~in_deleted_module(Task.module_id))
+        .group_by(Task.module_id)
+        .all()
+    )
+    total = sum(status_counts.values())
+    done = status_counts.get(TaskStatus.done, 0)
+    blocked = status_counts.get(TaskStatus.blocked, 0)
+    in_progress = status_counts.get(TaskStatus.in_progress, 0)
 
     # ── Sheet 1: 项目概览 ──────────────────────────────────
-    ws1 = wb.active
-    ws1.title = "项目概览"
-    ws1.row_dimensions[1].height = 22
-
-    overview_headers = ["字段", "内容"]
-    ws1.append(overview_headers)
-    _style_header_row(ws1, 1, 2)
+    ws1 = _new_sheet(wb, "项目概览", [18, 30])
+    _append_header(ws1, ["字段", "内容"])
 
     overview_rows = [
         ("项目名称", project.name),
@@ -86,33 +161,21 @@ def generate_excel(db: Session, project: Project) -> bytes:
         ("已完成", done),
         ("完成率", f"{round(done / total * 100)}%" if total else "0%"),
     ]
+    overview_rows += [(f"模块「{m.name}」任务数", module_counts.get(m.id, 0)) for m in modules]
     for i, row in enumerate(overview_rows, 2):
-        ws1.append(list(row))
-        _style_data_row(ws1, i, 2, alt=(i % 2 == 0))
-
-    next_row = len(overview_rows) + 2
-    for m in modules:
-        m_count = sum(1 for t in tasks if t.module_id is not None and str(t.module_id) == str(m.id))
-        ws1.append([f"模块「{m.name}」任务数", m_count])
-        _style_data_row(ws1, next_row, 2, alt=(next_row % 2 == 0))
-        next_row += 1
-
-    _set_col_widths(ws1, [18, 30])
+        _append_data(ws1, i, list(row))
 
     # ── Sheet 2: 任务明细 ──────────────────────────────────
-    ws2 = wb.create_sheet("任务明细")
-    ws2.row_dimensions[1].height = 22
     headers2 = ["模块", "任务标题", "描述", "负责人", "状态", "优先级", "进度(%)", "截止日期", "创建时间", "最后更新"]
-    ws2.append(headers2)
-    _style_header_row(ws2, 1, len(headers2))
+    ws2 = _new_sheet(wb, "任务明细", [16, 28, 36, 12, 10, 8, 8, 12, 16, 16])
+    _append_header(ws2, headers2)
 
-    for i, t in enumerate(tasks, 2):
-        module_name = module_name_map.get(str(t.module_id), "未分配") if t.module_id is not None else "未分配"
-        ws2.append([
-            module_name,
+    for i, t in enumerate(_task_rows(db, project.id), 2):
+        _append_data(ws2, i, [
+            t.module_name or "未分配",
             t.title,
             t.description or "",
-            t.assignee.name if t.assignee else "未指派",
+            t.assignee_name or "未指派",
             STATUS_LABELS.get(t.status.value, t.status.value),
             PRIORITY_LABELS.get(t.priority.value, t.priority.value),
             t.progress,
@@ -120,42 +183,53 @@ def generate_excel(db: Session, project: Project) -> bytes:
             str(t.created_at)[:16],
             str(t.updated_at)[:16],
         ])
-        _style_data_row(ws2, i, len(headers2), alt=(i % 2 == 0))
-    _set_col_widths(ws2, [16, 28, 36, 12, 10, 8, 8, 12, 16, 16])
 
     # ── Sheet 3: 进展日志 ──────────────────────────────────
-    ws3 = wb.create_sheet("进展日志")
-    ws3.row_dimensions[1].height = 22
     headers3 = ["任务标题", "记录人", "状态", "进度(%)", "进展内容", "记录时间"]
-    ws3.append(headers3)
-    _style_header_row(ws3, 1, len(headers3))
+    ws3 = _new_sheet(wb, "进展日志", [28, 12, 10, 8, 48, 16])
+    _append_header(ws3, headers3)
 
     row_idx = 2
-    for t in tasks:
-        logs = (
-            db.query(TaskLog)
-            .filter(TaskLog.task_id == t.id)
-            .order_by(TaskLog.created_at)
-            .all()
-        )
-        for log in logs:
-            ws3.append([
-                t.title,
-                log.user.name,
-                STATUS_LABELS.get(str(log.status), str(log.status)),
-                log.progress,
-                log.content,
-                str(log.created_at)[:16],
-            ])
-            _style_data_row(ws3, row_idx, len(headers3), alt=(row_idx % 2 == 0))
-            row_idx += 1
+    for log in _log_rows(db, project.id):
+        _append_data(ws3, row_idx, [
+            log.title,
+            log.user_name,
+            STATUS_LABELS.get(log.status.value, log.status.value),
+            log.progress,
+            log.content,
+            str(log.created_at)[:16],
+        ])
+        row_idx += 1
 
     if row_idx == 2:
-        ws3.append(["暂无进展记录", "", "", "", "", ""])
-        _style_data_row(ws3, 2, len(headers3))
+        _append_data(ws3, 2, ["暂无进展记录", "", "", "", "", ""])
+
+    wb.save(fileobj)
+
 
-    _set_col_widths(ws3, [28, 12, 10, 8, 48, 16])
+def iter_file(fileobj: BinaryIO, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    try:
+        fileobj.seek(0)
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
 
-    buf = BytesIO()
-    wb.save(buf)
-    return buf.getvalue()
+
+def stream_excel(db: Session, project: Project, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Build the workbook into a temporary file and return an iterator over its bytes.
+
+    The file is written eagerly so the caller's session can be closed before the
+    response body is sent; only one chunk is held in memory while streaming.
+    """
+    f = TemporaryFile()
+    try:
+        write_excel(db, project, f)
+    except Exception:
+        f.close()
+        raise
+    return iter_file(f, chunk_size)
+
+
+def generate_excel(db: Session, project: Project) -> bytes:
+    return b"".join(stream_excel(db, project))
@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+from app.models.module import Module
+from app.models.user import User
+from app.schemas.task import TaskBulkItem, TaskBulkResult
+from app.schemas.user import UserBulkItem, UserBulkResult
+from app.services.export_service import STATUS_LABELS, PRIORITY_LABELS
+from app.services.task_service import bulk_upsert_tasks
+from app.services.user_service import bulk_create_users
+
+# Sheet and columns of the 任务明细 export; 创建时间/最后更新 are ignored on import.
+TASK_SHEET = "任务明细"
+COLUMNS = {
+    "模块": "module",
+    "任务标题": "title",
+    "描述": "description",
+    "负责人": "assignee",
+    "状态": "status",
+    "优先级": "priority",
+    "进度(%)": "progress",
+    "截止日期": "due_date",
+}
+UNASSIGNED = {"", "未分配", "未指派"}
+
+# Columns of a user provisioning sheet; 项目 holds project ids separated by ";".
+USER_COLUMNS = {
+    "姓名": "name", "name": "name",
+    "邮箱": "email", "email": "email",
+    "密码": "password", "password": "password",
+    "角色": "role", "role": "role",
+    "项目": "project_ids", "project_ids": "project_ids",
+}
+_ROLE_VALUES = {"管理员": "admin", "成员": "member"}
+
+_STATUS_VALUES = {label: value for value, label in STATUS_LABELS.items()}
+_PRIORITY_VALUES = {label: value for value, label in PRIORITY_LABELS.items()}
+
+
+def _read_rows(filename: str, content: bytes) -> list[list]:
+    if filename.lower().endswith(".json"):
+        try:
+            data = json.loads(content.decode("utf-8-sig"))
+        except (UnicodeDecodeError, ValueError):
+            raise HTTPException(status_code=400, detail="Not a valid JSON file")
+        records = data.get("users") if isinstance(data, dict) else data
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise HTTPException(status_code=400, detail="JSON files must hold a list of objects")
+        header = list(dict.fromkeys(k for r in records for k in r))
+        return [header] + [[r.get(k) for k in header] for r in records]
+    if filename.lower().endswith(".csv"):
+        try:
+            return list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV files must be UTF-8 encoded")
+    if filename.lower().endswith(".xlsx"):
+        try:
+            wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Not a valid XLSX file")
+        ws = wb[TASK_SHEET] if TASK_SHEET in wb.sheetnames else wb.active
+        rows = [list(r) for r in ws.iter_rows(values_only=True)]
+        wb.close()
+        return rows
+    raise HTTPException(status_code=400, detail="Only .xlsx, .csv and .json files can be imported")
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _due_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return _text(value) or None
+
+
+def import_tasks(db: Session, project_id: UUID, filename: str, content: bytes, user: User) -> TaskBulkResult:
+    """Create tasks from a sheet laid out like the 任务明细 export.
+
+    Modules are matched by name within the project and assignees by name or
+    email. Errors are reported with spreadsheet row numbers (header = row 1).
+    """
+    rows = _read_rows(filename, content)
+    if not rows:
+        raise HTTPException(status_code=400, detail="The file is empty")
+    header = [_text(h) for h in rows[0]]
+    if "任务标题" not in header:
+        raise HTTPException(status_code=400, detail="Missing column: 任务标题")
+    index = {COLUMNS[h]: i for i, h in enumerate(header) if h in COLUMNS}
+
+    records = []
+    for row_number, values in enumerate(rows[1:], 2):
+        record = {key: values[i] if i < len(values) else None for key, i in index.items()}
+        if any(_text(v) for v in record.values()):
+            records.append((row_number, record))
+
+    module_names = {_text(r.get("module")) for _, r in records} - UNASSIGNED
+    modules = dict(db.execute(select(Module.name, Module.id)
+                                .where(Module.project_id == project_id, Module.name.in_(module_names),
+                                       Module.deleted_at.is_(None)))
+                     .all()) if module_names else {}
+    assignee_keys = {_text(r.get("assignee")) for _, r in records} - UNASSIGNED
+    assignees: dict[str, list[UUID]] = {}
+    if assignee_keys:
+        for user_id, name, email in db.execute(select(User.id, User.name, User.email)
+                                                 .where(or_(User.name.in_(assignee_keys), User.email.in_(assignee_keys)))):
+            for key in {name, email} & assignee_keys:
+                assignees.setdefault(key, []).append(user_id)
+
+    items, item_rows, errors = [], [], []
+    for row_number, record in records:
+        module, assignee = _text(record.get("module")), _text(record.get("assignee"))
+        status, priority = _text(record.get("status")), _text(record.get("priority"))
+        if module not in UNASSIGNED and module not in modules:
+            errors.append({"row": row_number, "detail": f"Unknown module: {module}"})
+            continue
+        if assignee not in UNASSIGNED and len(assignees.get(assignee, [])) != 1:
+            reason = "Ambiguous assignee" if assignees.get(assignee) else "Unknown assignee"
+            errors.append({"row": row_number, "detail": f"{reason}: {assignee}"})
+            continue
+        data = {
+            "title": _text(record.get("title")),
+            "description": _text(record.get("description")) or None,
+            "module_id": modules.get(module),
+            "assignee_id": assignees[assignee][0] if assignee not in UNASSIGNED else None,
+            "due_date": _due_date(record.get("due_date")),
+        }
+        if status:
+            data["status"] = _STATUS_VALUES.get(status, status)
+        if priority:
+            data["priority"] = _PRIORITY_VALUES.get(priority, priority)
+        if _text(record.get("progress")):
+            data["progress"] = record["progress"]
+        if not data["title"]:
+            errors.append({"row": row_number, "detail": "Missing 任务标题"})
+            continue
+        try:
+            items.append(TaskBulkItem(**data))
+            item_rows.append(row_number)
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+            errors.append({"row": row_number, "detail": detail})
+
+    if not items and not errors:
+        raise HTTPException(status_code=400, detail="No tasks found in the file")
+    return bulk_upsert_tasks(db, project_id, items, user, rows=item_rows, errors=errors)
+
+
+def import_users(db: Session, filename: str, content: bytes, admin: User,
+                 project_ids: Optional[list[UUID]] = None) -> UserBulkResult:
+    """Provision users from a CSV, XLSX or JSON file, each joining ``project_ids``.
+
+    See bulk_create_users for the checks on the projects.
+
+    Errors are reported with row numbers (header = row 1; the first JSON object
+    is row 2).
+    """
+    rows = _read_rows(filename, content)
+    if not rows:
+        raise HTTPException(status_code=400, detail="The file is empty")
+    header = [_text(h) for h in rows[0]]
+    index = {USER_COLUMNS[h]: i for i, h in enumerate(header) if h in USER_COLUMNS}
+    absent = [c for c in ("name", "email", "password") if c not in index]
+    if absent:
+        raise HTTPException(status_code=400, detail=f"Missing column: {', '.join(absent)}")
+
+    items, item_rows, errors = [], [], []
+    for row_number, values in enumerate(rows[1:], 2):
+        record = {key: values[i] if i < len(values) else None for key, i in index.items()}
+        if not any(_text(v) for v in record.values()):
+            continue
+        projects = record.get("project_ids")
+        if not isinstance(projects, list):
+            projects = [p.strip() for p in _text(projects).replace(",", ";").split(";") if p.strip()]
+        data = {
+            "name": _text(record.get("name")),
+            "email": _text(record.get("email")),
+            "password": _text(record.get("password")),
+            "project_ids": projects,
+        }
+        role = _text(record.get("role"))
+        if role:
+            data["role"] = _ROLE_VALUES.get(role, role)
+        try:
+            items.append(UserBulkItem(**data))
+            item_rows.append(row_number)
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+            errors.append({"row": row_number, "detail": detail})
+
+    if not items and not errors:
+        raise HTTPException(status_code=400, detail="No users found in the file")
+    return bulk_create_users(db, items, admin, project_ids, rows=item_rows, errors=errors)
@@ -1,31 +1,54 @@
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
 from uuid import UUID
+from app.database import eager
 from app.models.module import Module
-from app.models.task import Task, TaskLog
+from app.models.task import Task
 from app.models.user import User, UserRole
 from app.schemas.module import ModuleCreate, ModuleUpdate
+from app.services.event_service import record_event
+from app.services.stats_service import apply_task_set
 
 
-def list_modules(db: Session, project_id: UUID) -> list[Module]:
+def _list_modules_stmt(project_id: UUID):
     return (
-        db.query(Module)
-        .filter(Module.project_id == project_id)
+        select(Module)
+        .options(*eager(joinedload(Module.owner)))
+        .where(Module.project_id == project_id, Module.deleted_at.is_(None))
         .order_by(Module.order, Module.created_at)
-        .all()
     )
 
 
+def list_modules(db: Session, project_id: UUID) -> list[Module]:
+    return list(db.scalars(_list_modules_stmt(project_id)))
+
+
+async def list_modules_async(db: AsyncSession, project_id: UUID) -> list[Module]:
+    return list(await db.scalars(_list_modules_stmt(project_id)))
+
+
 def get_module_or_404(db: Session, module_id: UUID) -> Module:
-    module = db.query(Module).filter(Module.id == module_id).first()
+    module = db.query(Module).filter(Module.id == module_id, Module.deleted_at.is_(None)).first()
     if not module:
         raise HTTPException(status_code=404, detail="Module not found")
     return module
 
 
+async def get_module_or_404_async(db: AsyncSession, module_id: UUID) -> Module:
+    module = await db.get(Module, module_id)
+    if not module or module.deleted_at is not None:
+        raise HTTPException(status_code=404, detail="Module not found")
+    return module
+
+
 def create_module(db: Session, project_id: UUID, data: ModuleCreate) -> Module:
     module = Module(project_id=project_id, **data.model_dump())
     db.add(module)
+    db.flush()
+    record_event(db, project_id, "module.created", id=module.id)
     db.commit()
     db.refresh(module)
     return module
@@ -34,16 +57,15 @@ def create_module(db: Session, project_id: UUID, data: ModuleCreate) -> Module:
 def update_module(db: Session, module: Module, data: ModuleUpdate) -> Module:
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(module, k, v)
+    record_event(db, module.project_id, "module.updated", id=module.id)
     db.commit()
     db.refresh(module)
     return module
 
 
 def delete_module(db: Session, module: Module) -> None:
-    # Cascade: delete all task logs then tasks belonging to this module
-    task_ids = [t.id for t in db.query(Task.id).filter(Task.module_id == module.id).all()]
-    if task_ids:
-        db.query(TaskLog).filter(TaskLog.task_id.in_(task_ids)).delete(synchronize_session=False)
-        db.query(Task).filter(Task.module_id == module.id).delete(synchronize_session=False)
-    db.delete(module)
+    """Soft-delete a module; its tasks are hidden at once and purged in batches later."""
+    apply_task_set(db, module.project_id, Task.module_id == module.id, -1)
+    module.deleted_at = datetime.now(timezone.utc)
+    record_event(db, module.project_id, "module.deleted", id=module.id)
     db.commit()
@@ -1,55 +1,169 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from uuid import UUID
+from typing import Optional
+from app.cache import cache
+from app.config import settings
+from app.database import eager
+from app.etag import make_etag
 from app.models.project import Project, ProjectMember
 from app.models.user import User, UserRole
+from app.models.stats import ProjectStats, ProjectMemberStats
 from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.services.event_service import record_event
+from app.services.stats_service import rebuild_project_stats, project_version
+
+
+def _accessible_projects_stmt(user: User):
+    stmt = select(Project).options(*eager()).where(Project.deleted_at.is_(None))
+    if user.role == UserRole.admin:
+        return stmt.where(Project.owner_id == user.id)
+    return (stmt.join(ProjectMember, ProjectMember.project_id == Project.id)
+                .where(ProjectMember.user_id == user.id))
+
+
+def accessible_project_ids_stmt(user: User):
+    """Ids of the projects ``user`` can see, by the same rules as get_accessible_projects."""
+    if user.role == UserRole.admin:
+        return select(Project.id).where(Project.owner_id == user.id, Project.deleted_at.is_(None))
+    return (select(ProjectMember.project_id)
+              .join(Project, Project.id == ProjectMember.project_id)
+              .where(ProjectMember.user_id == user.id, Project.deleted_at.is_(None)))
+
+
+def accessible_projects_etag(db: Session, user: User) -> str:
+    """ETag of get_accessible_projects, from the project ids and update times only."""
+    rows = db.execute(select(Project.id, Project.updated_at)
+                        .where(Project.id.in_(accessible_project_ids_stmt(user)))
+                        .order_by(Project.id)).all()
+    return make_etag("projects", user.id, *(f"{r.id}@{r.updated_at}" for r in rows))
+
+
+def project_etag(db: Session, project_id: UUID, *parts) -> Optional[str]:
+    """ETag of a read endpoint of the project, from its version counter alone."""
+    version = project_version(db, project_id)
+    return make_etag(project_id, version, *parts) if version is not None else None
 
 
 def get_accessible_projects(db: Session, user: User) -> list[Project]:
+    return list(db.scalars(_accessible_projects_stmt(user)))
+
+
+async def get_accessible_projects_async(db: AsyncSession, user: User) -> list[Project]:
+    return list(await db.scalars(_accessible_projects_stmt(user)))
+
+
+def _access_key(project_id: UUID, user: User) -> str:
+    # The role is part of the key, so a role change never reuses a stale decision.
+    return f"acl:{project_id}:{user.id}:{user.role.value}"
+
+
+def _access_decision(project: Project, user: User, is_member: bool) -> dict:
     if user.role == UserRole.admin:
-        return db.query(Project).filter(Project.owner_id == user.id).all()
-    return (db.query(Project)
-              .join(ProjectMember, ProjectMember.project_id == Project.id)
-              .filter(ProjectMember.user_id == user.id)
-              .all())
+        if project.owner_id != user.id:
+            return {"status": 403, "detail": "Not your project"}
+    elif not is_member:
+        return {"status": 403, "detail": "Access denied"}
+    return {"status": 200, "detail": None}
+
+
+def _is_member(db: Session, project_id: UUID, user: User) -> bool:
+    return db.query(ProjectMember.id).filter(
+        ProjectMember.project_id == project_id,
+        ProjectMember.user_id == user.id
+    ).first() is not None
+
+
+def _enforce(decision: dict) -> None:
+    if decision["status"] != 200:
+        raise HTTPException(status_code=decision["status"], detail=decision["detail"])
+
+
+def _access_row_stmt(project_id: UUID, user: User):
+    return (select(Project.id, Project.owner_id, ProjectMember.id.label("membership_id"))
+              .outerjoin(ProjectMember, and_(ProjectMember.project_id == Project.id,
+                                             ProjectMember.user_id == user.id))
+              .where(Project.id == project_id, Project.deleted_at.is_(None)))
+
+
+def _cache_access_row(key: str, row, user: User) -> dict:
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    decision = _access_decision(row, user, row.membership_id is not None)
+    cache.set(key, decision, settings.access_cache_ttl_seconds)
+    return decision
+
+
+def check_project_access(db: Session, project_id: UUID, user: User) -> None:
+    """Authorize ``user`` on a project without loading it.
+
+    Decisions are cached per (project, user, role); a miss costs one query.
+    """
+    key = _access_key(project_id, user)
+    decision = cache.get(key)
+    if decision is None:
+        row = db.execute(_access_row_stmt(project_id, user)).first()
+        decision = _cache_access_row(key, row, user)
+    _enforce(decision)
+
+
+async def check_project_access_async(db: AsyncSession, project_id: UUID, user: User) -> None:
+    key = _access_key(project_id, user)
+    decision = cache.get(key)
+    if decision is None:
+        row = (await db.execute(_access_row_stmt(project_id, user))).first()
+        decision = _cache_access_row(key, row, user)
+    _enforce(decision)
 
 
 def get_project_or_403(db: Session, project_id: UUID, user: User) -> Project:
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.query(Project).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    if user.role == UserRole.admin:
-        if project.owner_id != user.id:
-            raise HTTPException(status_code=403, detail="Not your project")
-    else:
-        membership = db.query(ProjectMember).filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == user.id
-        ).first()
-        if not membership:
-            raise HTTPException(status_code=403, detail="Access denied")
+    key = _access_key(project_id, user)
+    decision = cache.get(key)
+    if decision is None:
+        is_member = user.role != UserRole.admin and _is_member(db, project_id, user)
+        decision = _access_decision(project, user, is_member)
+        cache.set(key, decision, settings.access_cache_ttl_seconds)
+    _enforce(decision)
     return project
 
 
+def invalidate_project_access(project_id: UUID, user_id: Optional[UUID] = None) -> None:
+    cache.delete_prefix(f"acl:{project_id}:{user_id}:" if user_id else f"acl:{project_id}:")
+
+
 def create_project(db: Session, data: ProjectCreate, owner: User) -> Project:
     project = Project(name=data.name, description=data.description, owner_id=owner.id)
     db.add(project)
+    db.flush()
+    db.add(ProjectStats(project_id=project.id))
     db.commit()
     db.refresh(project)
     return project
 
 
 def delete_project(db: Session, project: Project) -> None:
-    db.delete(project)
+    """Soft-delete a project: it disappears at once, the purger removes its rows in batches."""
+    project.deleted_at = datetime.now(timezone.utc)
+    record_event(db, project.id, "project.deleted")
     db.commit()
+    invalidate_project_access(project.id)
 
 
 def update_project(db: Session, project: Project, data: ProjectUpdate) -> Project:
+    owner_id = project.owner_id
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(project, k, v)
+    record_event(db, project.id, "project.updated")
     db.commit()
     db.refresh(project)
+    if project.owner_id != owner_id:
+        invalidate_project_access(project.id)
     return project
 
 
@@ -57,7 +171,9 @@ def add_member(db: Session, project: Project, user_id: UUID) -> None:
     if db.query(ProjectMember).filter_by(project_id=project.id, user_id=user_id).first():
         raise HTTPException(status_code=400, detail="Already a member")
     db.add(ProjectMember(project_id=project.id, user_id=user_id))
+    record_event(db, project.id, "member.added", user_id=user_id)
     db.commit()
+    invalidate_project_access(project.id, user_id)
 
 
 def remove_member(db: Session, project: Project, user_id: UUID) -> None:
@@ -65,41 +181,55 @@ def remove_member(db: Session, project: Project, user_id: UUID) -> None:
     if not m:
         raise HTTPException(status_code=404, detail="Member not found")
     db.delete(m)
+    record_event(db, project.id, "member.removed", user_id=user_id)
     db.commit()
+    invalidate_project_access(project.id, user_id)
 
 
-def get_project_members(db: Session, project_id: UUID) -> list[User]:
-    return (db.query(User)
+def _project_members_stmt(project_id: UUID):
+    return (select(User)
+              .options(*eager())
               .join(ProjectMember, ProjectMember.user_id == User.id)
-              .filter(ProjectMember.project_id == project_id)
-              .all())
+              .where(ProjectMember.project_id == project_id))
+
+
+def get_project_members(db: Session, project_id: UUID) -> list[User]:
+    return list(db.scalars(_project_members_stmt(project_id)))
+
+
+async def get_project_members_async(db: AsyncSession, project_id: UUID) -> list[User]:
+    return list(await db.scalars(_project_members_stmt(project_id)))
 
 
 from app.models.task import Task, TaskStatus
 
 
 def get_project_stats(db: Session, project_id: UUID) -> dict:
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
-    total = len(tasks)
-    by_status = {s.value: 0 for s in TaskStatus}
-    for t in tasks:
-        by_status[t.status.value] += 1
-    avg_progress = round(sum(t.progress for t in tasks) / total, 1) if total else 0
-
-    member_stats = []
-    members = get_project_members(db, project_id)
-    for m in members:
-        member_tasks = [t for t in tasks if t.assignee_id == m.id]
-        member_stats.append({
-            "user_id": str(m.id),
-            "name": m.name,
-            "total": len(member_tasks),
-            "done": sum(1 for t in member_tasks if t.status == TaskStatus.done),
-        })
+    stats = db.get(ProjectStats, project_id, populate_existing=True)
+    if stats is None:
+        rebuild_project_stats(db, project_id)
+        db.commit()
+        stats = db.get(ProjectStats, project_id)
+    total = stats.total
+    avg_progress = round(stats.progress_sum / total, 1) if total else 0
+
+    member_rows = (
+        db.query(User.id, User.name,
+                 func.coalesce(ProjectMemberStats.total, 0), func.coalesce(ProjectMemberStats.done, 0))
+        .join(ProjectMember, ProjectMember.user_id == User.id)
+        .outerjoin(ProjectMemberStats, and_(ProjectMemberStats.user_id == User.id,
+                                            ProjectMemberStats.project_id == project_id))
+        .filter(ProjectMember.project_id == project_id)
+        .all()
+    )
+    member_stats = [
+        {"user_id": str(user_id), "name": name, "total": count, "done": done}
+        for user_id, name, count, done in member_rows
+    ]
 
     return {
         "total_tasks": total,
-        "by_status": by_status,
+        "by_status": {s.value: getattr(stats, s.value) for s in TaskStatus},
         "avg_progress": avg_progress,
         "member_stats": member_stats,
     }
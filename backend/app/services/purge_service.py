@@ -0,0 +1,103 @@
+import logging
+import threading
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.module import Module
+from app.models.project import Project, ProjectMember
+from app.models.event import ProjectEvent
+from app.models.task import Task, TaskLog
+from app.services.event_service import trim_events
+from app.services.stats_service import delete_project_stats
+from app.services.token_service import trim_tokens
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _purge_tasks(db: Session, criteria, batch_size: int) -> int:
+    """Delete matching tasks and their logs, committing after every batch.
+
+    Each transaction locks at most ``batch_size`` tasks, so writers on the
+    rest of the table never wait behind one long cascade.
+    """
+    purged = 0
+    while True:
+        ids = list(db.scalars(select(Task.id).where(criteria).limit(batch_size)))
+        if not ids:
+            return purged
+        db.execute(delete(TaskLog).where(TaskLog.task_id.in_(ids)).execution_options(synchronize_session=False))
+        db.execute(delete(Task).where(Task.id.in_(ids)).execution_options(synchronize_session=False))
+        db.commit()
+        purged += len(ids)
+
+
+def purge_module(db: Session, module_id: UUID, batch_size: int) -> int:
+    purged = _purge_tasks(db, Task.module_id == module_id, batch_size)
+    db.execute(delete(Module).where(Module.id == module_id).execution_options(synchronize_session=False))
+    db.commit()
+    return purged
+
+
+def purge_project(db: Session, project_id: UUID, batch_size: int) -> int:
+    purged = _purge_tasks(db, Task.project_id == project_id, batch_size)
+    delete_project_stats(db, project_id)
+    for stmt in (
+        delete(Module).where(Module.project_id == project_id),
+        delete(ProjectMember).where(ProjectMember.project_id == project_id),
+        delete(ProjectEvent).where(ProjectEvent.project_id == project_id),
+        delete(Project).where(Project.id == project_id),
+    ):
+        db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    return purged
+
+
+def purge_deleted(db: Session, batch_size: Optional[int] = None) -> int:
+    """Remove every soft-deleted module and project and trim expired events and tokens.
+
+    Returns the number of tasks purged.
+    """
+    batch_size = batch_size or settings.purge_batch_size
+    purged = 0
+    for module_id in db.scalars(select(Module.id).where(Module.deleted_at.isnot(None))).all():
+        purged += purge_module(db, module_id, batch_size)
+    for project_id in db.scalars(select(Project.id).where(Project.deleted_at.isnot(None))).all():
+        purged += purge_project(db, project_id, batch_size)
+    trim_events(db)
+    trim_tokens(db)
+    return purged
+
+
+def _run() -> None:
+    while not _stop.wait(settings.purge_interval_seconds):
+        db = SessionLocal()
+        try:
+            purge_deleted(db)
+        except Exception:
+            logger.exception("Purging soft-deleted rows failed")
+            db.rollback()
+        finally:
+            db.close()
+
+
+def start_purger() -> None:
+    global _thread
+    if settings.purge_interval_seconds <= 0 or _thread is not None:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, name="purger", daemon=True)
+    _thread.start()
+
+
+def stop_purger() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join()
+        _thread = None
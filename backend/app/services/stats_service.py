@@ -0,0 +1,167 @@
+from collections import Counter, defaultdict
+from typing import Optional, NamedTuple
+from uuid import UUID
+from sqlalchemy import func, update, insert, select
+from sqlalchemy.orm import Session
+from app.models.module import in_deleted_module
+from app.models.stats import ProjectStats, ProjectMemberStats
+from app.models.task import Task, TaskStatus
+
+STAT_FIELDS = ["total", "todo", "in_progress", "done", "blocked", "progress_sum"]
+
+
+class TaskSnapshot(NamedTuple):
+    status: TaskStatus
+    assignee_id: Optional[UUID]
+    progress: int
+
+
+def snapshot(task: Task) -> TaskSnapshot:
+    return TaskSnapshot(TaskStatus(task.status), task.assignee_id, task.progress or 0)
+
+
+def _apply(db: Session, project_id: UUID, totals: Counter, members: dict[UUID, Counter]) -> None:
+    """Add deltas to the rollup rows with ``col = col + delta`` updates.
+
+    Projects without a rollup row are skipped; their row is rebuilt from the
+    tasks table the next time stats are read.
+    """
+    totals = {k: v for k, v in totals.items() if v}
+    if totals:
+        result = db.execute(
+            update(ProjectStats)
+            .where(ProjectStats.project_id == project_id)
+            .values({k: getattr(ProjectStats, k) + v for k, v in totals.items()})
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            return
+    elif db.get(ProjectStats, project_id) is None:
+        return
+
+    for user_id, delta in members.items():
+        if not delta["total"] and not delta["done"]:
+            continue
+        result = db.execute(
+            update(ProjectMemberStats)
+            .where(ProjectMemberStats.project_id == project_id, ProjectMemberStats.user_id == user_id)
+            .values(total=ProjectMemberStats.total + delta["total"],
+                    done=ProjectMemberStats.done + delta["done"])
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(ProjectMemberStats).values(
+                project_id=project_id, user_id=user_id, total=delta["total"], done=delta["done"]))
+
+
+def _add_snapshot(totals: Counter, members: dict, s: TaskSnapshot, sign: int, count: int = 1, progress: Optional[int] = None) -> None:
+    totals["total"] += sign * count
+    totals[s.status.value] += sign * count
+    totals["progress_sum"] += sign * (s.progress if progress is None else progress)
+    if s.assignee_id is not None:
+        members[s.assignee_id]["total"] += sign * count
+        if s.status == TaskStatus.done:
+            members[s.assignee_id]["done"] += sign * count
+
+
+def apply_task_change(db: Session, project_id: UUID,
+                      before: Optional[TaskSnapshot], after: Optional[TaskSnapshot]) -> None:
+    """Record a single task being created (before=None), changed, or deleted (after=None)."""
+    if before == after:
+        return
+    totals, members = Counter(), defaultdict(Counter)
+    if before is not None:
+        _add_snapshot(totals, members, before, -1)
+    if after is not None:
+        _add_snapshot(totals, members, after, 1)
+    _apply(db, project_id, totals, members)
+
+
+def apply_task_set(db: Session, project_id: UUID, criteria, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) every task matching ``criteria`` in one grouped query."""
+    totals, members = Counter(), defaultdict(Counter)
+    rows = (db.query(Task.status, Task.assignee_id, func.count(Task.id), func.coalesce(func.sum(Task.progress), 0))
+              .filter(Task.project_id == project_id, criteria)
+              .group_by(Task.status, Task.assignee_id)
+              .all())
+    for status, assignee_id, count, progress in rows:
+        _add_snapshot(totals, members, TaskSnapshot(status, assignee_id, 0), sign, count, progress)
+    _apply(db, project_id, totals, members)
+
+
+def bump_project_version(db: Session, project_id: UUID) -> None:
+    """Mark the project's tasks, modules and members as changed; the caller commits."""
+    db.execute(
+        update(ProjectStats)
+        .where(ProjectStats.project_id == project_id)
+        .values(version=ProjectStats.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def project_version(db: Session, project_id: UUID) -> Optional[int]:
+    return db.scalar(select(ProjectStats.version).where(ProjectStats.project_id == project_id))
+
+
+def compute_project_stats(db: Session, project_id: UUID) -> tuple[dict, dict[UUID, dict]]:
+    """Aggregate the tasks table directly; used to build and check the rollups."""
+    totals = {f: 0 for f in STAT_FIELDS}
+    members = defaultdict(lambda: {"total": 0, "done": 0})
+    rows = (db.query(Task.status, Task.assignee_id, func.count(Task.id), func.coalesce(func.sum(Task.progress), 0))
+              .filter(Task.project_id == project_id, ~in_deleted_module(Task.module_id))
+              .group_by(Task.status, Task.assignee_id)
+              .all())
+    for status, assignee_id, count, progress in rows:
+        totals["total"] += count
+        totals[status.value] += count
+        totals["progress_sum"] += progress
+        if assignee_id is not None:
+            members[assignee_id]["total"] += count
+            if status == TaskStatus.done:
+                members[assignee_id]["done"] += count
+    return totals, dict(members)
+
+
+def rebuild_project_stats(db: Session, project_id: UUID) -> dict:
+    """Rewrite the rollups of a project from the tasks table.
+
+    Returns the drift that was corrected as ``{field: (stored, actual)}``;
+    member fields are keyed as ``"<user_id>.total"`` / ``"<user_id>.done"``.
+    The caller commits.
+    """
+    totals, members = compute_project_stats(db, project_id)
+    drift = {}
+
+    stats = db.get(ProjectStats, project_id, populate_existing=True)
+    if stats is None:
+        stats = ProjectStats(project_id=project_id)
+        db.add(stats)
+    for f in STAT_FIELDS:
+        stored = getattr(stats, f) or 0
+        if stored != totals[f]:
+            drift[f] = (stored, totals[f])
+        setattr(stats, f, totals[f])
+
+    stored_members = {m.user_id: m for m in db.query(ProjectMemberStats)
+                                                  .filter_by(project_id=project_id)
+                                                  .populate_existing()}
+    for user_id in set(stored_members) | set(members):
+        row = stored_members.get(user_id)
+        actual = members.get(user_id, {"total": 0, "done": 0})
+        for f in ("total", "done"):
+            stored = getattr(row, f) if row else 0
+            if stored != actual[f]:
+                drift[f"{user_id}.{f}"] = (stored, actual[f])
+        if row is None:
+            db.add(ProjectMemberStats(project_id=project_id, user_id=user_id, **actual))
+        elif actual["total"]:
+            row.total, row.done = actual["total"], actual["done"]
+        else:
+            db.delete(row)
+    db.flush()
+    return drift
+
+
+def delete_project_stats(db: Session, project_id: UUID) -> None:
+    db.query(ProjectMemberStats).filter(ProjectMemberStats.project_id == project_id).delete(synchronize_session=False)
+    db.query(ProjectStats).filter(ProjectStats.project_id == project_id).delete(synchronize_session=False)
@@ -1,50 +1,341 @@
-from sqlalchemy.orm import Session
+import uuid
+from sqlalchemy import tuple_, select, insert, update, union_all, func, literal, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, joinedload
 from fastapi import HTTPException
 from uuid import UUID
 from typing import Optional
-from app.models.task import Task, TaskLog
+from datetime import date, datetime, timedelta, timezone
+from app.database import eager
+from app.models.module import Module, in_deleted_module
+from app.models.task import Task, TaskLog, TaskStatus
 from app.models.user import User, UserRole
-from app.schemas.task import TaskCreate, TaskUpdate, TaskLogCreate
-from app.services.project_service import get_project_or_403
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskLogCreate, TaskFilter, TaskBulkItem, TaskBulkResult,
+    TaskBatchUpdate, TaskBatchResult,
+)
+from app.services.project_service import check_project_access, check_project_access_async, accessible_project_ids_stmt
+from app.services.event_service import record_event
+from app.services.stats_service import apply_task_change, apply_task_set, snapshot
+
+# Rows per INSERT/UPDATE executemany batch in bulk writes.
+BULK_BATCH_SIZE = 1000
 
 
 def _check_module_permission(db: Session, user: User, module_id: Optional[UUID]) -> None:
     """Allow admin unconditionally; allow member only if they own the module."""
     if user.role == UserRole.admin:
+        if module_id is not None and db.query(Module.id).filter(
+                Module.id == module_id, Module.deleted_at.is_(None)).first() is None:
+            raise HTTPException(status_code=404, detail="Module not found")
         return
     if module_id is None:
         raise HTTPException(status_code=403, detail="Not authorized")
-    from app.models.module import Module
-    module = db.query(Module).filter(Module.id == module_id).first()
+    module = db.query(Module).filter(Module.id == module_id, Module.deleted_at.is_(None)).first()
     if not module or module.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Not authorized: not module owner")
 
 
 def get_task_or_403(db: Session, task_id: UUID, user: User) -> Task:
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(Task.id == task_id, ~in_deleted_module(Task.module_id)).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    get_project_or_403(db, task.project_id, user)
+    check_project_access(db, task.project_id, user)
     return task
 
 
-def list_tasks(db: Session, project_id: UUID) -> list:
-    return db.query(Task).filter(Task.project_id == project_id).all()
+async def get_task_or_403_async(db: AsyncSession, task_id: UUID, user: User) -> Task:
+    task = await db.scalar(select(Task).where(Task.id == task_id, ~in_deleted_module(Task.module_id)))
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    await check_project_access_async(db, task.project_id, user)
+    return task
+
+
+def _filter_tasks(query, filters: TaskFilter):
+    if filters.status:
+        query = query.filter(Task.status.in_(filters.status))
+    if filters.priority:
+        query = query.filter(Task.priority.in_(filters.priority))
+    if filters.assignee_id:
+        query = query.filter(Task.assignee_id == filters.assignee_id)
+    if filters.module_id:
+        query = query.filter(Task.module_id == filters.module_id)
+    if filters.due_from:
+        query = query.filter(Task.due_date >= filters.due_from)
+    if filters.due_to:
+        query = query.filter(Task.due_date <= filters.due_to)
+    return query
+
+
+def _task_options(fields: Optional[list[str]] = None) -> list:
+    """Joined loads for the many-to-one relationships TaskOut serializes."""
+    options = [joinedload(rel) for name, rel in (("assignee", Task.assignee), ("module", Task.module))
+               if fields is None or name in fields]
+    if fields is not None and "description" not in fields:
+        options.append(defer(Task.description))
+    return options
+
+
+def _list_tasks_stmt(project_id: UUID, filters: Optional[TaskFilter], limit: Optional[int],
+                     after: Optional[tuple[datetime, UUID]], fields: Optional[list[str]]):
+    stmt = select(Task).where(Task.project_id == project_id, ~in_deleted_module(Task.module_id))
+    if filters:
+        stmt = _filter_tasks(stmt, filters)
+    if after:
+        stmt = stmt.where(tuple_(Task.created_at, Task.id) > after)
+    return (stmt.options(*eager(*_task_options(fields)))
+                .order_by(Task.created_at, Task.id)
+                .limit(limit))
+
+
+def list_tasks(db: Session, project_id: UUID, filters: Optional[TaskFilter] = None,
+               limit: Optional[int] = None, after: Optional[tuple[datetime, UUID]] = None,
+               fields: Optional[list[str]] = None) -> list:
+    """Tasks of a project in ``(created_at, id)`` order, starting after the ``after`` key.
+
+    ``fields`` limits loading to the named TaskOut fields.
+    """
+    return list(db.scalars(_list_tasks_stmt(project_id, filters, limit, after, fields)))
+
+
+async def list_tasks_async(db: AsyncSession, project_id: UUID, filters: Optional[TaskFilter] = None,
+                           limit: Optional[int] = None, after: Optional[tuple[datetime, UUID]] = None,
+                           fields: Optional[list[str]] = None) -> list:
+    return list(await db.scalars(_list_tasks_stmt(project_id, filters, limit, after, fields)))
+
+
+def escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_tasks(db: Session, user: User, q: str, project_id: Optional[UUID] = None,
+                 limit: int = 20, offset: int = 0) -> list:
+    """Tasks whose title, description or a log contains ``q``, best match first.
+
+    Candidates come from the trigram indexes on each column, limited to the
+    projects ``user`` can access (and ``project_id``) inside each branch; the
+    rank weighs a title match above the description and the logs. Returns
+    ``(task, rank)`` rows.
+    """
+    pattern = f"%{escape_like(q)}%"
+    scope = [Task.project_id.in_(accessible_project_ids_stmt(user))]
+    if project_id:
+        scope.append(Task.project_id == project_id)
+    candidates = union_all(
+        select(Task.id.label("task_id"), literal(0.0).label("log_score"))
+        .where(Task.title.ilike(pattern, escape="\\") | Task.description.ilike(pattern, escape="\\"), *scope),
+        select(TaskLog.task_id, func.word_similarity(q, TaskLog.content))
+        .join(Task, Task.id == TaskLog.task_id)
+        .where(TaskLog.content.ilike(pattern, escape="\\"), *scope),
+    ).subquery()
+    matches = (select(candidates.c.task_id, func.max(candidates.c.log_score).label("log_score"))
+                 .group_by(candidates.c.task_id)
+                 .subquery())
+    rank = (case((Task.title.ilike(pattern, escape="\\"), 1.0), else_=0.0)
+            + func.word_similarity(q, Task.title) * 2
+            + func.word_similarity(q, func.coalesce(Task.description, ""))
+            + matches.c.log_score * 0.5).label("rank")
+
+    stmt = (select(Task, rank)
+              .join(matches, matches.c.task_id == Task.id)
+              .where(~in_deleted_module(Task.module_id)))
+    stmt = (stmt.options(*eager(*_task_options()))
+                .order_by(rank.desc(), Task.created_at.desc(), Task.id)
+                .limit(limit)
+                .offset(offset))
+    return db.execute(stmt).all()
+
+
+def list_my_tasks(db: Session, user: User, status: Optional[list[TaskStatus]] = None,
+                  due_from: Optional[date] = None, due_to: Optional[date] = None,
+                  limit: Optional[int] = None, offset: int = 0) -> list:
+    """Tasks assigned to ``user`` in every project they can access, in one query.
+
+    Ordered by due date (undated last), then most urgent first.
+    """
+    stmt = select(Task).where(Task.assignee_id == user.id,
+                              Task.project_id.in_(accessible_project_ids_stmt(user)),
+                              ~in_deleted_module(Task.module_id))
+    if status:
+        stmt = stmt.where(Task.status.in_(status))
+    if due_from:
+        stmt = stmt.where(Task.due_date >= due_from)
+    if due_to:
+        stmt = stmt.where(Task.due_date <= due_to)
+    stmt = (stmt.options(*eager(*_task_options()))
+                .order_by(Task.due_date.asc().nulls_last(), Task.priority.desc(), Task.created_at, Task.id)
+                .limit(limit)
+                .offset(offset))
+    return list(db.scalars(stmt))
 
 
 def create_task(db: Session, project_id: UUID, data: TaskCreate, user: User) -> Task:
     _check_module_permission(db, user, data.module_id)
     task = Task(project_id=project_id, **data.model_dump())
     db.add(task)
+    db.flush()
+    apply_task_change(db, project_id, None, snapshot(task))
+    record_event(db, project_id, "task.created", ids=[task.id])
     db.commit()
     db.refresh(task)
     return task
 
 
+def _module_error(user: User, module_id: Optional[UUID], owners: dict[UUID, Optional[UUID]]) -> Optional[str]:
+    """Bulk counterpart of _check_module_permission over preloaded module owners."""
+    if module_id is not None and module_id not in owners:
+        return "Module not found"
+    if user.role == UserRole.admin:
+        return None
+    if module_id is None:
+        return "Not authorized"
+    if owners[module_id] != user.id:
+        return "Not authorized: not module owner"
+    return None
+
+
+def _batches(items: list, size: int = BULK_BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def bulk_upsert_tasks(db: Session, project_id: UUID, items: list[TaskBulkItem], user: User,
+                      rows: Optional[list[int]] = None, errors: Optional[list[dict]] = None) -> TaskBulkResult:
+    """Create or update many tasks of a project in one transaction.
+
+    Items with an ``id`` update that task, or create it with that id. All rows are
+    checked before anything is written: if any fails, nothing is written and a 422
+    lists them as ``{"row", "detail"}``. ``rows`` labels each item in that report
+    (default: its index); ``errors`` are row errors the caller already found.
+    """
+    rows = rows if rows is not None else list(range(len(items)))
+    errors = list(errors or [])
+
+    ids = [item.id for item in items if item.id]
+    existing = {r.id: r for r in db.execute(
+        select(Task.id, Task.project_id, Task.module_id).where(Task.id.in_(ids)))} if ids else {}
+    module_ids = ({item.module_id for item in items if item.module_id}
+                  | {r.module_id for r in existing.values() if r.module_id})
+    owners = dict(db.execute(select(Module.id, Module.owner_id)
+                               .where(Module.id.in_(module_ids), Module.project_id == project_id,
+                                      Module.deleted_at.is_(None))).all()) if module_ids else {}
+    assignee_ids = {item.assignee_id for item in items if item.assignee_id}
+    assignees = set(db.scalars(select(User.id).where(User.id.in_(assignee_ids)))) if assignee_ids else set()
+
+    seen = set()
+    for row, item in zip(rows, items):
+        current = existing.get(item.id)
+        if item.id and item.id in seen:
+            detail = "Duplicate task id"
+        elif current and current.project_id != project_id:
+            detail = "Task belongs to another project"
+        elif current:
+            detail = _module_error(user, current.module_id, owners)
+            if not detail and "module_id" in item.model_fields_set:
+                detail = _module_error(user, item.module_id, owners)
+        elif not item.title:
+            detail = "Missing title"
+        else:
+            detail = _module_error(user, item.module_id, owners)
+        if not detail and item.assignee_id and item.assignee_id not in assignees:
+            detail = "Assignee not found"
+        if detail:
+            errors.append({"row": row, "detail": detail})
+        seen.add(item.id)
+    if errors:
+        raise HTTPException(status_code=422, detail=sorted(errors, key=lambda e: e["row"]))
+
+    now = datetime.now(timezone.utc)
+    inserts, updates, task_ids = [], [], []
+    for n, item in enumerate(items):
+        if item.id in existing:
+            updates.append({"id": item.id, **item.model_dump(exclude_unset=True, exclude={"id"})})
+            task_ids.append(item.id)
+        else:
+            task_id = item.id or uuid.uuid4()
+            # Distinct timestamps keep the input order in (created_at, id) listings.
+            inserts.append({**item.model_dump(exclude={"id"}), "id": task_id,
+                            "project_id": project_id, "created_at": now + timedelta(microseconds=n)})
+            task_ids.append(task_id)
+
+    if updates:
+        apply_task_set(db, project_id, Task.id.in_([u["id"] for u in updates]), -1)
+        for batch in _batches(updates):
+            db.execute(update(Task), batch)
+    for batch in _batches(inserts):
+        db.execute(insert(Task), batch)
+    apply_task_set(db, project_id, Task.id.in_(task_ids), 1)
+    if inserts:
+        record_event(db, project_id, "task.created", ids=[i["id"] for i in inserts])
+    if updates:
+        record_event(db, project_id, "task.updated", ids=[u["id"] for u in updates])
+    db.commit()
+    return TaskBulkResult(created=len(inserts), updated=len(updates), ids=task_ids)
+
+
+def batch_update_tasks(db: Session, project_id: UUID, data: TaskBatchUpdate, user: User) -> TaskBatchResult:
+    """Apply the same changes to every task selected by ``data.ids`` or ``data.filter``.
+
+    Permissions are checked once per distinct module; the change is a single
+    UPDATE and the optional logs a batched INSERT, all in one transaction.
+    """
+    if (data.ids is None) == (data.filter is None):
+        raise HTTPException(status_code=400, detail="Give either ids or filter")
+    changes = data.changes.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+
+    stmt = (select(Task.id, Task.module_id, Task.assignee_id)
+              .where(Task.project_id == project_id, ~in_deleted_module(Task.module_id)))
+    stmt = stmt.where(Task.id.in_(data.ids)) if data.ids else _filter_tasks(stmt, data.filter)
+    targets = db.execute(stmt.order_by(Task.created_at, Task.id)).all()
+    task_ids = [t.id for t in targets]
+    missing = sorted(set(data.ids) - set(task_ids), key=data.ids.index) if data.ids else []
+
+    checked = {t.module_id for t in targets}
+    if "module_id" in changes:
+        checked.add(changes["module_id"])
+    module_ids = checked - {None}
+    owners = dict(db.execute(select(Module.id, Module.owner_id)
+                               .where(Module.id.in_(module_ids), Module.project_id == project_id,
+                                      Module.deleted_at.is_(None))).all()) if module_ids else {}
+    for module_id in checked:
+        detail = _module_error(user, module_id, owners)
+        if detail:
+            raise HTTPException(status_code=404 if detail == "Module not found" else 403, detail=detail)
+    if "assignee_id" in changes and db.get(User, changes["assignee_id"]) is None:
+        raise HTTPException(status_code=404, detail="Assignee not found")
+    if data.log is not None and user.role == UserRole.member and any(t.assignee_id != user.id for t in targets):
+        raise HTTPException(status_code=403, detail="Can only log on your own tasks")
+    if not targets:
+        return TaskBatchResult(updated=0, ids=[], missing=missing)
+
+    selected = Task.id.in_(task_ids)
+    apply_task_set(db, project_id, selected, -1)
+    result = db.execute(
+        update(Task).where(selected).values(changes)
+        .returning(Task.id, Task.status, Task.progress)
+        .execution_options(synchronize_session=False)
+    ).all()
+    apply_task_set(db, project_id, selected, 1)
+    if data.log is not None:
+        logs = [{"task_id": r.id, "user_id": user.id, "content": data.log,
+                 "progress": r.progress, "status": r.status} for r in result]
+        for batch in _batches(logs):
+            db.execute(insert(TaskLog), batch)
+    record_event(db, project_id, "task.updated", ids=task_ids)
+    db.commit()
+    return TaskBatchResult(updated=len(result), ids=task_ids, missing=missing)
+
+
 def update_task(db: Session, task: Task, data: TaskUpdate, user: User) -> Task:
     _check_module_permission(db, user, task.module_id)
+    before = snapshot(task)
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(task, k, v)
+    apply_task_change(db, task.project_id, before, snapshot(task))
+    record_event(db, task.project_id, "task.updated", ids=[task.id])
     db.commit()
     db.refresh(task)
     return task
@@ -52,6 +343,8 @@ def update_task(db: Session, task: Task, data: TaskUpdate, user: User) -> Task:
 
 def delete_task(db: Session, task: Task, user: User) -> None:
     _check_module_permission(db, user, task.module_id)
+    apply_task_change(db, task.project_id, snapshot(task), None)
+    record_event(db, task.project_id, "task.deleted", ids=[task.id])
     db.delete(task)
     db.commit()
 
@@ -61,16 +354,57 @@ def create_log(db: Session, task: Task, data: TaskLogCreate, user: User) -> Task
         raise HTTPException(status_code=403, detail="Can only log on your own tasks")
     log = TaskLog(task_id=task.id, user_id=user.id,
                   content=data.content, progress=data.progress, status=data.status.value)
+    before = snapshot(task)
     task.progress = data.progress
     task.status = data.status
+    apply_task_change(db, task.project_id, before, snapshot(task))
     db.add(log)
+    db.flush()
+    record_event(db, task.project_id, "log.created", task_id=task.id, id=log.id)
     db.commit()
     db.refresh(log)
     return log
 
 
-def list_logs(db: Session, task_id: UUID) -> list:
-    return (db.query(TaskLog)
-              .filter(TaskLog.task_id == task_id)
-              .order_by(TaskLog.created_at.desc())
-              .all())
+def _log_key_stmt(task_id: UUID, log_id: UUID):
+    return select(TaskLog.created_at, TaskLog.id).where(TaskLog.id == log_id, TaskLog.task_id == task_id)
+
+
+def _log_key(row) -> tuple:
+    if not row:
+        raise HTTPException(status_code=400, detail="Unknown log cursor")
+    return tuple(row)
+
+
+def _list_logs_stmt(task_id: UUID, limit: Optional[int], before_key: Optional[tuple], since_key: Optional[tuple]):
+    key = tuple_(TaskLog.created_at, TaskLog.id)
+    stmt = (select(TaskLog)
+              .options(*eager(joinedload(TaskLog.user)))
+              .where(TaskLog.task_id == task_id))
+    if before_key:
+        stmt = stmt.where(key < before_key)
+    if since_key:
+        # Oldest first so a limited page never skips logs; callers reverse it.
+        return stmt.where(key > since_key).order_by(TaskLog.created_at, TaskLog.id).limit(limit)
+    return stmt.order_by(TaskLog.created_at.desc(), TaskLog.id.desc()).limit(limit)
+
+
+def list_logs(db: Session, task_id: UUID, limit: Optional[int] = None,
+              before: Optional[UUID] = None, since: Optional[UUID] = None) -> list:
+    """Logs of a task, newest first.
+
+    ``before`` pages back from the given log; ``since`` returns only logs newer
+    than it (the oldest ``limit`` of them, so polling clients never skip any).
+    """
+    before_key = _log_key(db.execute(_log_key_stmt(task_id, before)).first()) if before else None
+    since_key = _log_key(db.execute(_log_key_stmt(task_id, since)).first()) if since else None
+    logs = list(db.scalars(_list_logs_stmt(task_id, limit, before_key, since_key)))
+    return logs[::-1] if since else logs
+
+
+async def list_logs_async(db: AsyncSession, task_id: UUID, limit: Optional[int] = None,
+                          before: Optional[UUID] = None, since: Optional[UUID] = None) -> list:
+    before_key = _log_key((await db.execute(_log_key_stmt(task_id, before))).first()) if before else None
+    since_key = _log_key((await db.execute(_log_key_stmt(task_id, since))).first()) if since else None
+    logs = list(await db.scalars(_list_logs_stmt(task_id, limit, before_key, since_key)))
+    return logs[::-1] if since else logs
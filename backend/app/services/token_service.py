@@ -0,0 +1,249 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from jose import jwt, JWTError
+from sqlalchemy import select, update, delete, insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.token import RefreshToken, TokenRevocation
+from app.models.user import User, UserRole
+
+ALGORITHM = "HS256"
+
+
+def _unauthorized(detail: str = "Invalid token") -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+class RevocationList:
+    """In-memory mirror of the unexpired token_revocations rows.
+
+    Revocations made in this worker apply at once; those made elsewhere are
+    picked up by ``sync``, which re-reads the rows at most every
+    ``revocation_sync_seconds``.
+    """
+
+    def __init__(self):
+        self._jtis: dict[UUID, datetime] = {}
+        self._versions: dict[UUID, tuple[int, datetime]] = {}
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, expires_at: datetime, jti: Optional[UUID] = None,
+            user_id: Optional[UUID] = None, min_version: Optional[int] = None) -> None:
+        with self._lock:
+            if jti is not None:
+                self._jtis[jti] = expires_at
+            if user_id is not None:
+                current = self._versions.get(user_id)
+                if current is None or min_version >= current[0]:
+                    self._versions[user_id] = (min_version, expires_at)
+
+    def sync(self, db: Session) -> None:
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < settings.revocation_sync_seconds:
+            return
+        self._synced_at = now
+        # Re-read every unexpired row: ids are not committed in order, so
+        # reading only ids above the last one seen could skip a late commit.
+        # The rows live no longer than an access token, so there are few.
+        rows = db.execute(select(TokenRevocation)
+                            .where(TokenRevocation.expires_at > datetime.now(timezone.utc))).scalars().all()
+        for row in rows:
+            self.add(row.expires_at, row.jti, row.user_id, row.min_version)
+        self._prune()
+
+    def _prune(self) -> None:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for jti in [k for k, exp in self._jtis.items() if exp <= now]:
+                del self._jtis[jti]
+            for user_id in [k for k, (_, exp) in self._versions.items() if exp <= now]:
+                del self._versions[user_id]
+
+    def is_revoked(self, user_id: UUID, jti: Optional[UUID], version: int) -> bool:
+        if jti is not None and jti in self._jtis:
+            return True
+        entry = self._versions.get(user_id)
+        return entry is not None and version < entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jtis.clear()
+            self._versions.clear()
+            self._synced_at = None
+
+
+revocations = RevocationList()
+
+
+def create_access_token(user: User) -> str:
+    """A short-lived token carrying everything the authorization layer reads."""
+    now = datetime.now(timezone.utc)
+    data = {
+        "sub": str(user.id), "role": user.role.value, "name": user.name,
+        "ver": user.token_version or 0, "jti": str(uuid.uuid4()), "type": "access",
+        "iat": now, "exp": now + timedelta(minutes=settings.access_token_expire_minutes),
+    }
+    return jwt.encode(data, settings.secret_key, algorithm=ALGORITHM)
+
+
+def _encode_refresh_token(user_id: UUID, jti: UUID, expires_at: datetime) -> str:
+    data = {"sub": str(user_id), "jti": str(jti), "type": "refresh", "exp": expires_at}
+    return jwt.encode(data, settings.secret_key, algorithm=ALGORITHM)
+
+
+def _create_refresh_token(db: Session, user: User, jti: Optional[UUID] = None) -> str:
+    jti = jti or uuid.uuid4()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    db.add(RefreshToken(id=jti, user_id=user.id, expires_at=expires_at))
+    return _encode_refresh_token(user.id, jti, expires_at)
+
+
+def issue_tokens(db: Session, user: User, refresh_jti: Optional[UUID] = None) -> dict:
+    """An access/refresh token pair for ``user``; the caller commits."""
+    return {
+        "access_token": create_access_token(user),
+        "refresh_token": _create_refresh_token(db, user, refresh_jti),
+        "expires_in": settings.access_token_expire_minutes * 60,
+    }
+
+
+def _decode(token: str, token_type: str) -> dict:
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
+        payload["sub"] = UUID(payload["sub"])
+        payload["jti"] = UUID(payload["jti"]) if payload.get("jti") else None
+    except (JWTError, KeyError, ValueError, TypeError):
+        raise _unauthorized()
+    # Access tokens issued before token types existed have no "type".
+    if payload.get("type", "access") != token_type:
+        raise _unauthorized()
+    return payload
+
+
+def principal_from_token(db: Session, token: str) -> tuple[dict, Optional[User]]:
+    """Validate an access token and build the user from its claims.
+
+    Costs no query unless the revocation list is due for a sync. Returns the
+    claims and a transient ``User`` (None for tokens issued without claims,
+    which the caller loads instead).
+    """
+    payload = _decode(token, "access")
+    revocations.sync(db)
+    if revocations.is_revoked(payload["sub"], payload["jti"], payload.get("ver", 0)):
+        raise _unauthorized("Token revoked")
+    if "name" not in payload or "ver" not in payload:
+        return payload, None
+    return payload, User(id=payload["sub"], name=payload["name"], role=UserRole(payload["role"]),
+                         token_version=payload["ver"])
+
+
+def _access_token_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+
+
+def revoke_user_tokens(db: Session, user: User) -> None:
+    """Invalidate every token of ``user``, e.g. after a role change; the caller commits."""
+    user.token_version = (user.token_version or 0) + 1
+    expires_at = _access_token_expiry()
+    db.execute(insert(TokenRevocation).values(user_id=user.id, min_version=user.token_version, expires_at=expires_at))
+    db.execute(update(RefreshToken)
+                 .where(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None))
+                 .values(revoked_at=datetime.now(timezone.utc)))
+    revocations.add(expires_at, user_id=user.id, min_version=user.token_version)
+
+
+def _reissue_rotated(db: Session, used: RefreshToken) -> Optional[tuple[User, dict]]:
+    """The pair a just-rotated refresh token was exchanged for, within the grace window.
+
+    Tabs sharing storage refresh with the same token at once; the later ones
+    get the successor the first one received instead of tripping reuse detection.
+    """
+    if not used.replaced_by or not used.revoked_at:
+        return None
+    now = datetime.now(timezone.utc)
+    if now - used.revoked_at > timedelta(seconds=settings.refresh_reuse_grace_seconds):
+        return None
+    successor = db.get(RefreshToken, used.replaced_by)
+    if successor is None or successor.revoked_at is not None or successor.expires_at <= now:
+        return None
+    user = db.get(User, used.user_id)
+    if not user:
+        return None
+    return user, {
+        "access_token": create_access_token(user),
+        "refresh_token": _encode_refresh_token(user.id, successor.id, successor.expires_at),
+        "expires_in": settings.access_token_expire_minutes * 60,
+    }
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[User, dict]:
+    """Exchange a refresh token for a new pair; each refresh token works once.
+
+    Presenting a token again within ``refresh_reuse_grace_seconds`` of its
+    rotation returns the same successor. Presenting it later means it leaked,
+    so all of the user's tokens are revoked. Expired tokens and tokens revoked
+    by a logout are simply refused.
+    """
+    payload = _decode(token, "refresh")
+    now = datetime.now(timezone.utc)
+    successor_jti = uuid.uuid4()
+    row = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == payload["jti"], RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now)
+        .values(revoked_at=now, replaced_by=successor_jti)
+        .returning(RefreshToken.user_id)
+    ).first()
+    if row is None:
+        db.rollback()
+        used = db.get(RefreshToken, payload["jti"])
+        if used is None or used.replaced_by is None:
+            raise _unauthorized("Refresh token expired or revoked")
+        reissued = _reissue_rotated(db, used)
+        if reissued:
+            return reissued
+        user = db.get(User, used.user_id)
+        if user:
+            revoke_user_tokens(db, user)
+            db.commit()
+        raise _unauthorized("Refresh token already used")
+    user = db.get(User, row.user_id)
+    if not user:
+        raise _unauthorized("User not found")
+    tokens = issue_tokens(db, user, successor_jti)
+    db.commit()
+    return user, tokens
+
+
+def logout(db: Session, access_token: Optional[str], refresh_token: Optional[str]) -> None:
+    if access_token:
+        try:
+            payload = _decode(access_token, "access")
+        except HTTPException:
+            payload = None
+        if payload and payload["jti"]:
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+            db.execute(insert(TokenRevocation).values(jti=payload["jti"], expires_at=expires_at))
+            revocations.add(expires_at, jti=payload["jti"])
+    if refresh_token:
+        try:
+            payload = _decode(refresh_token, "refresh")
+        except HTTPException:
+            payload = None
+        if payload:
+            db.execute(update(RefreshToken)
+                         .where(RefreshToken.id == payload["jti"], RefreshToken.revoked_at.is_(None))
+                         .values(revoked_at=datetime.now(timezone.utc)))
+    db.commit()
+
+
+def trim_tokens(db: Session) -> None:
+    now = datetime.now(timezone.utc)
+    db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= now))
+    db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+    db.commit()
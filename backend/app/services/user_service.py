@@ -1,8 +1,19 @@
+import uuid
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import exists, func, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from app.models.project import Project, ProjectMember
 from app.models.user import User
-from app.schemas.user import UserCreate
-from app.services.auth_service import hash_password
+from app.schemas.user import UserCreate, UserBulkItem, UserBulkResult
+from app.services.auth_service import hash_password, hash_passwords, invalidate_user
+from app.services.event_service import record_event
+from app.services.task_service import BULK_BATCH_SIZE, escape_like
+from app.services.token_service import revoke_user_tokens
 
 
 def create_user(db: Session, data: UserCreate) -> User:
@@ -17,19 +28,126 @@ def create_user(db: Session, data: UserCreate) -> User:
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
     return user
 
 
-def get_all_users(db: Session) -> list[User]:
-    return db.query(User).all()
+def bulk_create_users(db: Session, items: list[UserBulkItem], admin: User, project_ids: Optional[list] = None,
+                      rows: Optional[list[int]] = None, errors: Optional[list[dict]] = None) -> UserBulkResult:
+    """Create many users, and their project memberships, in one transaction.
+
+    Every item joins ``project_ids`` plus its own ``project_ids``, which must all
+    be projects ``admin`` owns, as for adding a member one at a time. All rows are
+    checked with one query per kind before any password is hashed: if any fails,
+    nothing is written and a 422 lists them as ``{"row", "detail"}``. ``rows``
+    labels each item in that report (default: its index); ``errors`` are row
+    errors the caller already found.
+    """
+    rows = rows if rows is not None else list(range(len(items)))
+    errors = list(errors or [])
+    project_ids = list(project_ids or [])
+
+    emails = {item.email for item in items}
+    taken = set(db.scalars(select(User.email).where(User.email.in_(emails))))
+    wanted = set(project_ids) | {p for item in items for p in item.project_ids}
+    owners = dict(db.execute(select(Project.id, Project.owner_id)
+                               .where(Project.id.in_(wanted), Project.deleted_at.is_(None))).all()) if wanted else {}
+    for project_id in project_ids:
+        if project_id not in owners:
+            raise HTTPException(status_code=404, detail=f"Project not found: {project_id}")
+        if owners[project_id] != admin.id:
+            raise HTTPException(status_code=403, detail=f"Not your project: {project_id}")
+
+    seen = set()
+    for row, item in zip(rows, items):
+        unknown = [p for p in item.project_ids if p not in owners]
+        foreign = [p for p in item.project_ids if p in owners and owners[p] != admin.id]
+        if item.email in seen:
+            errors.append({"row": row, "detail": "Duplicate email"})
+        elif item.email in taken:
+            errors.append({"row": row, "detail": "Email already registered"})
+        elif unknown:
+            errors.append({"row": row, "detail": f"Project not found: {unknown[0]}"})
+        elif foreign:
+            errors.append({"row": row, "detail": f"Not your project: {foreign[0]}"})
+        seen.add(item.email)
+    if errors:
+        raise HTTPException(status_code=422, detail=sorted(errors, key=lambda e: e["row"]))
+
+    hashes = hash_passwords([item.password for item in items])
+    users, members = [], []
+    for item, password_hash in zip(items, hashes):
+        user_id = uuid.uuid4()
+        users.append({"id": user_id, "name": item.name, "email": item.email,
+                      "password_hash": password_hash, "role": item.role})
+        for project_id in dict.fromkeys(project_ids + item.project_ids):
+            members.append({"project_id": project_id, "user_id": user_id})
+
+    try:
+        for i in range(0, len(users), BULK_BATCH_SIZE):
+            db.execute(insert(User), users[i:i + BULK_BATCH_SIZE])
+        for i in range(0, len(members), BULK_BATCH_SIZE):
+            db.execute(insert(ProjectMember), members[i:i + BULK_BATCH_SIZE])
+    except IntegrityError:
+        # Another request registered one of the emails since the check above
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    joined: dict = {}
+    for m in members:
+        joined.setdefault(m["project_id"], []).append(m["user_id"])
+    for project_id, user_ids in joined.items():
+        record_event(db, project_id, "member.added", user_ids=user_ids)
+    db.commit()
+    return UserBulkResult(created=len(users), ids=[u["id"] for u in users], memberships=len(members))
+
+
+def _list_users_stmt(q: Optional[str], exclude_project_id: Optional[UUID],
+                     limit: Optional[int], after: Optional[tuple[datetime, UUID]]):
+    stmt = select(User)
+    if q:
+        # Under three characters a trigram index cannot help, so match a prefix
+        # through the lower() indexes; otherwise any substring.
+        if len(q) < 3:
+            pattern = f"{escape_like(q.lower())}%"
+            stmt = stmt.where(or_(func.lower(User.name).like(pattern, escape="\\"),
+                                  func.lower(User.email).like(pattern, escape="\\")))
+        else:
+            pattern = f"%{escape_like(q)}%"
+            stmt = stmt.where(or_(User.name.ilike(pattern, escape="\\"), User.email.ilike(pattern, escape="\\")))
+    if exclude_project_id:
+        stmt = stmt.where(~exists().where(ProjectMember.project_id == exclude_project_id,
+                                          ProjectMember.user_id == User.id))
+    if after:
+        stmt = stmt.where(tuple_(User.created_at, User.id) > after)
+    stmt = stmt.order_by(User.created_at, User.id)
+    return stmt.limit(limit) if limit else stmt
+
+
+def list_users(db: Session, q: Optional[str] = None, exclude_project_id: Optional[UUID] = None,
+               limit: Optional[int] = None, after: Optional[tuple[datetime, UUID]] = None) -> list[User]:
+    """Users in ``(created_at, id)`` order, starting after the ``after`` key.
+
+    ``q`` matches name or email; ``exclude_project_id`` leaves out that
+    project's members, for the member picker.
+    """
+    return list(db.scalars(_list_users_stmt(q, exclude_project_id, limit, after)))
+
+
+async def list_users_async(db: AsyncSession, q: Optional[str] = None, exclude_project_id: Optional[UUID] = None,
+                           limit: Optional[int] = None, after: Optional[tuple[datetime, UUID]] = None) -> list[User]:
+    return list(await db.scalars(_list_users_stmt(q, exclude_project_id, limit, after)))
 
 
 def update_user(db: Session, user_id: str, data: dict) -> User:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    revoke = "role" in data and data["role"] != user.role or "password_hash" in data
     for k, v in data.items():
         setattr(user, k, v)
+    if revoke:
+        revoke_user_tokens(db, user)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
     return user
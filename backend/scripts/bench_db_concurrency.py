@@ -0,0 +1,79 @@
+"""
+对比同步（线程池 + psycopg2）与异步（asyncio + asyncpg）数据库访问在不同并发下的吞吐量与延迟。
+
+每个请求执行一次任务列表查询（与 GET /projects/{id}/tasks 相同的语句）。
+
+使用方式：
+  cd backend
+  python scripts/bench_db_concurrency.py --project-id <id>
+  python scripts/bench_db_concurrency.py --project-id <id> --concurrency 1 8 32 128 --requests 500
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+sys.path.insert(0, ".")
+from app.database import SessionLocal, AsyncSessionLocal, get_async_engine
+from app.models import user, project, task, module, stats  # noqa: F401 - ensure all models are loaded
+from app.services.task_service import list_tasks, list_tasks_async
+
+SYNC_THREADS = 40  # anyio 默认线程池大小，即同步路由的并发上限
+
+
+def _report(mode: str, concurrency: int, elapsed: float, latencies: list[float]) -> None:
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"{mode:<6} 并发 {concurrency:>4}  {len(latencies) / elapsed:8.1f} req/s  "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms")
+
+
+def bench_sync(project_id: UUID, concurrency: int, requests: int) -> None:
+    def one(_):
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            list_tasks(db, project_id, limit=100)
+        finally:
+            db.close()
+        return time.perf_counter() - start
+
+    # 超过线程数的并发请求只能排队，这里按 min(并发, 线程数) 执行
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(concurrency, SYNC_THREADS)) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    _report("sync", concurrency, time.perf_counter() - start, latencies)
+
+
+async def bench_async(project_id: UUID, concurrency: int, requests: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                await list_tasks_async(db, project_id, limit=100)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    _report("async", concurrency, time.perf_counter() - start, list(latencies))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--project-id", type=UUID, required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        await asyncio.to_thread(bench_sync, args.project_id, concurrency, args.requests)
+        await bench_async(args.project_id, concurrency, args.requests)
+    await get_async_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""
+测量删除大项目的耗时与内存峰值：造一个含大量任务和进展日志的临时项目，
+先调用 delete_project（软删除），再用 purge_project 分批清除。
+
+软删除只更新一行；清除每批锁定 --batch-size 个任务，Python 侧内存不随任务数增长。
+清除耗时超过 --max-seconds、或内存峰值超过 --max-mb 时以非零状态退出，可用于 CI。
+
+使用方式：
+  cd backend
+  python scripts/bench_delete_project.py
+  python scripts/bench_delete_project.py --tasks 50000 --logs-per-task 2 --batch-size 500 --max-seconds 60 --max-mb 50
+"""
+import sys
+import time
+import uuid
+import argparse
+import tracemalloc
+from sqlalchemy import insert
+sys.path.insert(0, ".")
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.models.project import Project
+from app.models.module import Module
+from app.models.task import Task, TaskLog, TaskStatus
+from app.models import stats  # noqa: F401 - ensure all models are loaded
+from app.services.auth_service import hash_password
+from app.services.project_service import delete_project
+from app.services.purge_service import purge_project
+from app.services.stats_service import rebuild_project_stats
+
+BATCH = 5000
+
+
+def seed(db, tasks: int, logs_per_task: int) -> tuple[Project, User]:
+    owner = User(name="bench", email=f"bench-{uuid.uuid4().hex[:8]}@bench.local",
+                 password_hash=hash_password("bench"), role=UserRole.admin)
+    db.add(owner)
+    db.flush()
+    project = Project(name="删除基准", owner_id=owner.id)
+    db.add(project)
+    db.flush()
+    module = Module(project_id=project.id, name="M")
+    db.add(module)
+    db.flush()
+
+    statuses = list(TaskStatus)
+    for start in range(0, tasks, BATCH):
+        task_rows = [
+            {"id": uuid.uuid4(), "project_id": project.id, "module_id": module.id, "title": f"任务 {i}",
+             "assignee_id": owner.id, "status": statuses[i % len(statuses)], "progress": i % 101}
+            for i in range(start, min(start + BATCH, tasks))
+        ]
+        db.execute(insert(Task), task_rows)
+        if logs_per_task:
+            db.execute(insert(TaskLog), [
+                {"task_id": row["id"], "user_id": owner.id, "content": "进展", "progress": row["progress"],
+                 "status": row["status"]}
+                for row in task_rows for _ in range(logs_per_task)
+            ])
+    rebuild_project_stats(db, project.id)
+    db.commit()
+    return project, owner
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--logs-per-task", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-seconds", type=float)
+    parser.add_argument("--max-mb", type=float)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    print(f"写入 {args.tasks} 个任务、{args.tasks * args.logs_per_task} 条日志 ...")
+    project, owner = seed(db, args.tasks, args.logs_per_task)
+    db.expunge_all()
+    project_id = project.id
+    project = db.get(Project, project_id)
+
+    start = time.perf_counter()
+    delete_project(db, project)
+    soft_elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    purge_project(db, project_id, args.batch_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_mb = peak / 1024 / 1024
+
+    left = db.query(Task.id).filter(Task.project_id == project_id).count()
+    db.query(User).filter(User.id == owner.id).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+    print(f"软删除耗时 {soft_elapsed * 1000:.1f} ms")
+    print(f"清除耗时 {elapsed:.2f} s（每批 {args.batch_size} 个任务），Python 内存峰值 {peak_mb:.2f} MB，残留任务 {left}")
+    failed = left > 0
+    if args.max_seconds is not None and elapsed > args.max_seconds:
+        print(f"超过时间上限 {args.max_seconds} s")
+        failed = True
+    if args.max_mb is not None and peak_mb > args.max_mb:
+        print(f"超过内存上限 {args.max_mb} MB")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
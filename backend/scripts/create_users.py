@@ -0,0 +1,58 @@
+"""
+批量创建用户，可同时加入项目。
+
+文件为 CSV、XLSX 或 JSON，列为 姓名/name、邮箱/email、密码/password，
+可选 角色/role（admin、member 或 管理员、成员）和 项目/project_ids（项目 ID，以 ; 分隔）。
+JSON 为对象列表，或 {"users": [...]}。任何一行有误时不创建任何用户。
+--admin 为执行导入的管理员邮箱；用户只能加入该管理员负责的项目。
+
+使用方式：
+  cd backend
+  python scripts/create_users.py users.csv --admin admin@company.com
+  python scripts/create_users.py users.json --admin admin@company.com --project <项目ID> --project <项目ID>
+"""
+import sys
+import argparse
+from uuid import UUID
+sys.path.insert(0, ".")
+from fastapi import HTTPException
+from app.database import SessionLocal
+from app.models import user, project, task, module, stats, event, token  # noqa: F401 - ensure all models are loaded
+from app.models.user import User, UserRole
+from app.services.auth_service import shutdown_hashing
+from app.services.import_service import import_users
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file")
+    parser.add_argument("--admin", required=True, help="执行导入的管理员邮箱")
+    parser.add_argument("--project", type=UUID, action="append", default=[],
+                        help="所有用户加入的项目，可重复")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        content = f.read()
+    db = SessionLocal()
+    admin = db.query(User).filter(User.email == args.admin, User.role == UserRole.admin).first()
+    if not admin:
+        print(f"管理员 {args.admin} 不存在")
+        db.close()
+        sys.exit(1)
+    try:
+        result = import_users(db, args.file, content, admin, args.project)
+    except HTTPException as e:
+        if isinstance(e.detail, list):
+            for error in e.detail:
+                print(f"第 {error['row']} 行：{error['detail']}")
+        else:
+            print(e.detail)
+        sys.exit(1)
+    finally:
+        db.close()
+        shutdown_hashing()
+    print(f"完成：创建 {result.created} 个用户，加入项目 {result.memberships} 人次")
+
+
+if __name__ == "__main__":
+    main()
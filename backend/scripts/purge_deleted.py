@@ -0,0 +1,33 @@
+"""
+分批清除已软删除的项目和模块（及其任务、进展日志）。
+
+API 进程内置了定时清除（PURGE_INTERVAL_SECONDS）；设为 0 关闭后，可用本脚本由 cron 执行。
+
+使用方式：
+  cd backend
+  python scripts/purge_deleted.py
+  python scripts/purge_deleted.py --batch-size 200
+"""
+import sys
+import argparse
+sys.path.insert(0, ".")
+from app.database import SessionLocal
+from app.models import user, project, task, module, stats  # noqa: F401 - ensure all models are loaded
+from app.services.purge_service import purge_deleted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        purged = purge_deleted(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"完成：清除 {purged} 个任务")
+
+
+if __name__ == "__main__":
+    main()
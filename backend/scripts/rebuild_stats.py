@@ -0,0 +1,51 @@
+"""
+从 tasks 表重建项目统计汇总（project_stats / project_member_stats），并报告偏差。
+
+使用方式：
+  cd backend
+  python scripts/rebuild_stats.py                   # 重建全部项目
+  python scripts/rebuild_stats.py --project-id <id> # 只重建指定项目
+  python scripts/rebuild_stats.py --dry-run         # 只报告偏差，不写入
+"""
+import sys
+import argparse
+from uuid import UUID
+sys.path.insert(0, ".")
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models import user, task, module, stats  # noqa: F401 - ensure all models are loaded
+from app.services.stats_service import rebuild_project_stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--project-id", type=UUID)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    query = db.query(Project.id, Project.name)
+    if args.project_id:
+        query = query.filter(Project.id == args.project_id)
+
+    drifted = 0
+    for project_id, name in query.all():
+        drift = rebuild_project_stats(db, project_id)
+        if drift:
+            drifted += 1
+            print(f"项目「{name}」({project_id}) 统计偏差：")
+            for field, (stored, actual) in sorted(drift.items()):
+                print(f"  {field}: {stored} -> {actual}")
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+
+    action = "发现" if args.dry_run else "已修复"
+    print(f"完成：{action} {drifted} 个项目存在偏差")
+    db.close()
+    sys.exit(1 if drifted and args.dry_run else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
+import os
+os.environ.setdefault("ORM_RAISE_ON_LAZY_LOAD", "true")
+os.environ.setdefault("PURGE_INTERVAL_SECONDS", "0")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("METRICS_ENABLED", "true")
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event as sa_event
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.database import Base, get_db
 from app.models.user import User, UserRole
-from app.models import project, task, module  # noqa: F401 - register all models with SQLAlchemy
+from app.models import project, task, module, stats, event, token  # noqa: F401 - register all models with SQLAlchemy
 from app.services.auth_service import hash_password
+from app.cache import cache
+from app.services.token_service import revocations
 
-import os
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "postgresql://kuafu:kuafu_pass@db:5432/kuafu_test")
 
 engine = create_engine(TEST_DATABASE_URL)
@@ -17,6 +25,8 @@ TestingSessionLocal = sessionmaker(bind=engine)
 @pytest.fixture(autouse=True)
 def setup_db():
     Base.metadata.create_all(bind=engine)
+    cache.clear()
+    revocations.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -28,6 +38,16 @@ def db():
     finally:
         session.close()
 
+@pytest.fixture
+def query_counter():
+    """Collects every SQL statement sent to the test database while active."""
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    sa_event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    sa_event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
 @pytest.fixture
 def client(db):
     def override_get_db():
@@ -21,3 +21,135 @@ def test_me_returns_current_user(client, admin_token):
 def test_me_invalid_token(client):
     res = client.get("/api/v1/auth/me", headers={"Authorization": "Bearer invalid"})
     assert res.status_code == 401
+
+def test_authenticated_user_is_cached(client, admin_token, query_counter):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    query_counter.clear()
+    res = client.get("/api/v1/auth/me", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["email"] == "admin@test.com"
+    assert query_counter == []
+
+def test_update_user_invalidates_cached_user(client, admin_token, admin_user, db):
+    from app.services.user_service import update_user
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    client.get("/api/v1/auth/me", headers=headers)
+    update_user(db, admin_user.id, {"name": "Renamed"})
+    assert client.get("/api/v1/auth/me", headers=headers).json()["name"] == "Renamed"
+
+def test_login_upgrades_hash_below_configured_cost(client, admin_user, db, monkeypatch):
+    from passlib.context import CryptContext
+    from app.services import auth_service
+    assert admin_user.password_hash.startswith("$2b$04$")
+    monkeypatch.setattr(auth_service, "pwd_context", CryptContext(
+        schemes=["bcrypt"], bcrypt__rounds=5, bcrypt__min_rounds=5))
+    res = client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"})
+    assert res.status_code == 200
+    db.refresh(admin_user)
+    assert admin_user.password_hash.startswith("$2b$05$")
+    assert client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"}).status_code == 200
+
+def test_login_is_rejected_when_hashing_is_saturated(client, admin_user, monkeypatch):
+    import threading
+    from app.config import settings
+    from app.services import auth_service
+    full = threading.BoundedSemaphore(1)
+    full.acquire()
+    monkeypatch.setattr(settings, "password_hash_workers", 1)
+    monkeypatch.setattr(auth_service, "_slots", full)
+    res = client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"})
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+
+def test_hashing_recovers_from_a_dead_worker(monkeypatch):
+    from app.config import settings
+    from app.services import auth_service
+    monkeypatch.setattr(settings, "password_hash_workers", 1)
+    try:
+        auth_service.hash_password("x")
+        for process in list(auth_service._executor._processes.values()):
+            process.kill()
+            process.join()
+        assert auth_service.verify_password("x", auth_service.hash_password("x"))
+        assert len(auth_service.hash_passwords(["a", "b", "c"])) == 3
+    finally:
+        auth_service.shutdown_hashing()
+
+def test_refresh_rotates_and_detects_reuse(client, admin_user, monkeypatch):
+    from app.config import settings
+    login = client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"}).json()
+    assert login["expires_in"] > 0
+    rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert rotated.status_code == 200
+    new = rotated.json()
+    assert new["refresh_token"] != login["refresh_token"]
+    assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {new['access_token']}"}).status_code == 200
+
+    # A second tab refreshing with the same token just after gets the same successor.
+    again = client.post("/api/v1/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert again.status_code == 200
+    assert again.json()["refresh_token"] == new["refresh_token"]
+
+    # Past the grace window, replaying the used refresh token revokes the whole session family.
+    monkeypatch.setattr(settings, "refresh_reuse_grace_seconds", 0)
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": new["refresh_token"]}).status_code == 401
+    assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {new['access_token']}"}).status_code == 401
+
+def test_expired_refresh_token_leaves_other_sessions(client, admin_user, db):
+    from datetime import datetime, timedelta, timezone
+    from app.models.token import RefreshToken
+    stale = client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"}).json()
+    live = client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"}).json()
+    db.query(RefreshToken).filter(RefreshToken.id != _jti(live["refresh_token"])) \
+        .update({"expires_at": datetime.now(timezone.utc) - timedelta(minutes=1)})
+    db.commit()
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": stale["refresh_token"]}).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": live["refresh_token"]}).status_code == 200
+    assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {live['access_token']}"}).status_code == 200
+
+def _jti(token):
+    from jose import jwt
+    from uuid import UUID
+    return UUID(jwt.get_unverified_claims(token)["jti"])
+
+def test_logout_revokes_tokens(client, admin_user):
+    login = client.post("/api/v1/auth/login", json={"email": "admin@test.com", "password": "admin123"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.post("/api/v1/auth/logout", json={"refresh_token": login["refresh_token"]}, headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
+
+def test_role_change_revokes_access_tokens(client, admin_token, member_token, member_user, db):
+    from app.models.user import UserRole
+    from app.services.user_service import update_user
+    member = {"Authorization": f"Bearer {member_token}"}
+    assert client.get("/api/v1/projects", headers=member).status_code == 200
+    update_user(db, member_user.id, {"role": UserRole.admin})
+    assert client.get("/api/v1/projects", headers=member).status_code == 401
+    login = client.post("/api/v1/auth/login", json={"email": "dev@test.com", "password": "dev123"}).json()
+    assert login["role"] == "admin"
+    assert client.get("/api/v1/users", headers={"Authorization": f"Bearer {login['access_token']}"}).status_code == 200
+
+def test_authorization_needs_no_user_lookup(client, admin_token, query_counter):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    client.get("/api/v1/users", headers=headers)
+    query_counter.clear()
+    assert client.get("/api/v1/users", headers=headers).status_code == 200
+    assert len(query_counter) == 1  # the user listing itself
+
+def test_revocation_sync_picks_up_late_commits(db, admin_user):
+    from datetime import datetime, timedelta, timezone
+    from app.models.token import TokenRevocation
+    from app.services.token_service import revocations
+    expires = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db.add(TokenRevocation(id=100, user_id=admin_user.id, min_version=1, expires_at=expires))
+    db.commit()
+    revocations.sync(db)
+    # A lower id committing after a higher one was already read must still apply.
+    db.add(TokenRevocation(id=50, user_id=admin_user.id, min_version=2, expires_at=expires))
+    db.commit()
+    revocations._synced_at = None
+    revocations.sync(db)
+    assert revocations.is_revoked(admin_user.id, None, 1)
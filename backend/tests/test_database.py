@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import NullPool
+from app import database
+from app.config import settings
+from app.database import InstrumentedQueuePool, pool_status
+from app.metrics import db_checkout_seconds, db_checkout_timeouts
+from tests.conftest import TEST_DATABASE_URL
+
+
+def test_pool_records_checkout_wait_and_timeouts():
+    engine = create_engine(TEST_DATABASE_URL, poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    checkouts, timeouts = db_checkout_seconds.snapshot()["count"], db_checkout_timeouts.value
+    try:
+        with engine.connect():
+            assert pool_status(engine)["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+    finally:
+        engine.dispose()
+    assert db_checkout_seconds.snapshot()["count"] == checkouts + 2
+    assert db_checkout_timeouts.value == timeouts + 1
+
+
+def test_pgbouncer_mode_disables_client_pool(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+    options = database._engine_options("postgresql+asyncpg://u@h/db", is_async=True)
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"] == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+
+def test_statement_timeout_is_a_startup_option(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+    options = database._engine_options("postgresql://u@h/db")
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert options["pool_size"] == settings.db_pool_size
+
+
+def test_health_db_reports_pool(client):
+    res = client.get("/health/db")
+    assert res.status_code == 200
+    assert {"checked_out", "overflow", "checkout_timeouts", "checkout_seconds"} <= res.json().keys()
@@ -0,0 +1,175 @@
+import pytest
+from io import BytesIO
+from openpyxl import load_workbook
+from app.models.project import Project
+from app.models.module import Module
+from app.models.task import Task, TaskLog, TaskStatus
+
+
+@pytest.fixture
+def project(db, admin_user):
+    p = Project(name="导出项目", owner_id=admin_user.id)
+    db.add(p)
+    db.commit()
+    db.refresh(p)
+    return p
+
+
+@pytest.fixture
+def populated(db, project, admin_user, member_user):
+    m = Module(project_id=project.id, name="后端", owner_id=admin_user.id)
+    db.add(m)
+    db.commit()
+    t1 = Task(project_id=project.id, module_id=m.id, title="接口", assignee_id=member_user.id,
+              status=TaskStatus.done, progress=100)
+    t2 = Task(project_id=project.id, title="文档")
+    db.add_all([t1, t2])
+    db.commit()
+    db.add(TaskLog(task_id=t1.id, user_id=member_user.id, content="完成", progress=100, status=TaskStatus.done))
+    db.commit()
+    return project
+
+
+def _export(client, admin_token, project):
+    res = client.get(f"/api/v1/projects/{project.id}/export",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert res.status_code == 200
+    return load_workbook(BytesIO(res.content))
+
+
+def test_export_sheets_and_rows(client, admin_token, populated):
+    wb = _export(client, admin_token, populated)
+    assert wb.sheetnames == ["项目概览", "任务明细", "进展日志"]
+
+    overview = {row[0]: row[1] for row in wb["项目概览"].iter_rows(min_row=2, values_only=True)}
+    assert overview["总任务数"] == 2
+    assert overview["已完成"] == 1
+    assert overview["完成率"] == "50%"
+    assert overview["模块「后端」任务数"] == 1
+
+    tasks = {row[1]: row for row in wb["任务明细"].iter_rows(min_row=2, values_only=True)}
+    assert tasks["接口"][0] == "后端"
+    assert tasks["接口"][3] == "Dev"
+    assert tasks["接口"][4] == "已完成"
+    assert tasks["文档"][0] == "未分配"
+    assert tasks["文档"][3] == "未指派"
+
+    logs = list(wb["进展日志"].iter_rows(min_row=2, values_only=True))
+    assert [(r[0], r[1], r[2], r[4]) for r in logs] == [("接口", "Dev", "已完成", "完成")]
+
+
+def test_export_uses_shared_named_styles(client, admin_token, populated):
+    wb = _export(client, admin_token, populated)
+    ws = wb["任务明细"]
+    assert ws["A1"].style == "kf_header"
+    assert {ws["A2"].style, ws["A3"].style} == {"kf_row", "kf_row_alt"}
+
+
+def test_export_empty_project(client, admin_token, project):
+    wb = _export(client, admin_token, project)
+    assert wb["项目概览"]["B5"].value == 0
+    assert wb["进展日志"]["A2"].value == "暂无进展记录"
+
+
+def _add_tasks(db, project, user, count):
+    for i in range(count):
+        t = Task(project_id=project.id, title=f"T{i}", assignee_id=user.id)
+        db.add(t)
+        db.flush()
+        db.add(TaskLog(task_id=t.id, user_id=user.id, content="c", progress=10, status=TaskStatus.in_progress))
+    db.commit()
+
+
+def test_export_query_count_is_independent_of_size(db, populated, member_user, query_counter):
+    from app.services.export_service import generate_excel
+
+    db.refresh(populated)
+    query_counter.clear()
+    generate_excel(db, populated)
+    small = len(query_counter)
+
+    _add_tasks(db, populated, member_user, 25)
+    db.refresh(populated)
+    query_counter.clear()
+    generate_excel(db, populated)
+
+    assert len(query_counter) == small
+    assert small <= 5
+
+
+@pytest.fixture
+def export_jobs(monkeypatch, tmp_path):
+    from app.config import settings
+    from app.services import export_job_service
+    from tests.conftest import TestingSessionLocal
+    monkeypatch.setattr(settings, "export_cache_dir", str(tmp_path))
+    monkeypatch.setattr(export_job_service, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(export_job_service, "_jobs", {})
+    return tmp_path
+
+
+def _wait_for_job(client, admin_token, project, job_id):
+    import time
+    for _ in range(100):
+        res = client.get(f"/api/v1/projects/{project.id}/exports/{job_id}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert res.status_code == 200
+        if res.json()["status"] in ("done", "failed"):
+            return res.json()
+        time.sleep(0.05)
+    raise AssertionError("export job did not finish")
+
+
+def test_export_job_download_and_range(client, admin_token, populated, export_jobs):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    res = client.post(f"/api/v1/projects/{populated.id}/exports", headers=headers)
+    assert res.status_code == 202
+    job = _wait_for_job(client, admin_token, populated, res.json()["id"])
+    assert job["status"] == "done"
+
+    url = f"/api/v1/projects/{populated.id}/exports/{job['id']}/download"
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    assert load_workbook(BytesIO(full.content)).sheetnames == ["项目概览", "任务明细", "进展日志"]
+
+    part = client.get(url, headers={**headers, "Range": "bytes=10-99"})
+    assert part.status_code == 206
+    assert part.headers["content-range"] == f"bytes 10-99/{len(full.content)}"
+    assert part.content == full.content[10:100]
+
+    bad = client.get(url, headers={**headers, "Range": f"bytes={len(full.content)}-"})
+    assert bad.status_code == 416
+
+
+def test_export_job_reuses_cache_until_project_changes(client, admin_token, populated, export_jobs, db):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first = client.post(f"/api/v1/projects/{populated.id}/exports", headers=headers).json()
+    _wait_for_job(client, admin_token, populated, first["id"])
+
+    again = client.post(f"/api/v1/projects/{populated.id}/exports", headers=headers).json()
+    assert again["id"] == first["id"]
+    assert again["status"] == "done"
+
+    db.add(Task(project_id=populated.id, title="新任务"))
+    db.commit()
+    changed = client.post(f"/api/v1/projects/{populated.id}/exports", headers=headers).json()
+    assert changed["id"] != first["id"]
+    _wait_for_job(client, admin_token, populated, changed["id"])
+
+    # Renaming a module is a project write, so the cache key moves too.
+    module = db.query(Module).filter_by(project_id=populated.id).first()
+    res = client.patch(f"/api/v1/modules/{module.id}", json={"name": "重命名"}, headers=headers)
+    assert res.status_code == 200
+    renamed = client.post(f"/api/v1/projects/{populated.id}/exports", headers=headers).json()
+    assert renamed["id"] != changed["id"]
+    _wait_for_job(client, admin_token, populated, renamed["id"])
+
+
+def test_export_job_unknown_id(client, admin_token, project, export_jobs):
+    res = client.get(f"/api/v1/projects/{project.id}/exports/{'0' * 32}",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert res.status_code == 404
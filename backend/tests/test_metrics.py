@@ -0,0 +1,30 @@
+import logging
+from app.config import settings
+from app.metrics import http_request_queries, http_request_seconds
+from app.models.project import Project
+
+
+def test_requests_are_recorded_per_route_template(client, admin_token, admin_user, db):
+    p = Project(name="P", owner_id=admin_user.id)
+    db.add(p)
+    db.commit()
+    route = "/api/v1/projects/{project_id}"
+    before = http_request_seconds.child("GET", route, "200").snapshot()["count"]
+    res = client.get(f"/api/v1/projects/{p.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 200
+    assert http_request_seconds.child("GET", route, "200").snapshot()["count"] == before + 1
+    assert http_request_queries.child("GET", route).snapshot()["sum"] > 0
+
+    body = client.get("/metrics").text
+    assert f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}}' in body
+    assert f'http_request_db_queries_bucket{{method="GET",route="{route}",le="+Inf"}}' in body
+    assert str(p.id) not in body
+
+
+def test_slow_requests_log_their_top_queries(client, admin_token, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_request_ms", 0.001)
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        client.get("/api/v1/projects", headers={"Authorization": f"Bearer {admin_token}"})
+    record = next(r for r in caplog.records if "GET /api/v1/projects " in r.getMessage())
+    assert "queries" in record.getMessage()
+    assert "SELECT" in record.getMessage()
@@ -86,10 +86,14 @@ def test_delete_module_cascades_tasks(client, admin_token, project, module_obj,
     db.commit()
     task_id = task.id
 
-    client.delete(
-        f"/api/v1/modules/{module_obj.id}",
-        headers={"Authorization": f"Bearer {admin_token}"},
-    )
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    client.delete(f"/api/v1/modules/{module_obj.id}", headers=headers)
+    assert client.get(f"/api/v1/tasks/{task_id}/logs", headers=headers).status_code == 404
+    assert client.get(f"/api/v1/projects/{project.id}/tasks", headers=headers).json() == []
+    assert client.get(f"/api/v1/projects/{project.id}/modules", headers=headers).json() == []
+
+    from app.services.purge_service import purge_deleted
+    assert purge_deleted(db) == 1
     db.expire_all()
     task_after = db.query(Task).filter(Task.id == task_id).first()
     assert task_after is None
@@ -52,3 +52,193 @@ def test_admin_list_only_own_projects(client, admin_token, project):
     )
     assert res.status_code == 200
     assert len(res.json()) == 1
+
+
+def test_project_stats(client, admin_token, project, member_user, db):
+    from app.models.project import ProjectMember
+    from app.models.task import Task, TaskStatus
+    db.add(ProjectMember(project_id=project.id, user_id=member_user.id))
+    db.add_all([
+        Task(project_id=project.id, title="a", assignee_id=member_user.id, status=TaskStatus.done, progress=100),
+        Task(project_id=project.id, title="b", assignee_id=member_user.id, status=TaskStatus.in_progress, progress=50),
+        Task(project_id=project.id, title="c", status=TaskStatus.todo, progress=0),
+    ])
+    db.commit()
+
+    res = client.get(f"/api/v1/projects/{project.id}/stats",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert res.status_code == 200
+    assert res.json() == {
+        "total_tasks": 3,
+        "by_status": {"todo": 1, "in_progress": 1, "done": 1, "blocked": 0},
+        "avg_progress": 50.0,
+        "member_stats": [{"user_id": str(member_user.id), "name": "Dev", "total": 2, "done": 1}],
+    }
+
+
+def test_project_stats_empty(client, admin_token, project):
+    res = client.get(f"/api/v1/projects/{project.id}/stats",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert res.json()["total_tasks"] == 0
+    assert res.json()["avg_progress"] == 0
+    assert res.json()["member_stats"] == []
+
+
+def test_project_stats_rollup_follows_task_changes(client, admin_token, member_user, db):
+    from app.models.project import ProjectMember
+    from app.models.module import Module
+    from app.services.stats_service import rebuild_project_stats
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    from uuid import UUID
+    project_id = UUID(client.post("/api/v1/projects", json={"name": "Rollup"}, headers=headers).json()["id"])
+    db.add(ProjectMember(project_id=project_id, user_id=member_user.id))
+    module = Module(project_id=project_id, name="M")
+    db.add(module)
+    db.commit()
+
+    a = client.post(f"/api/v1/projects/{project_id}/tasks",
+        json={"title": "a", "assignee_id": str(member_user.id)}, headers=headers).json()
+    b = client.post(f"/api/v1/projects/{project_id}/tasks",
+        json={"title": "b", "module_id": str(module.id)}, headers=headers).json()
+    c = client.post(f"/api/v1/projects/{project_id}/tasks", json={"title": "c"}, headers=headers).json()
+    client.patch(f"/api/v1/tasks/{a['id']}", json={"status": "done", "progress": 100}, headers=headers)
+    client.post(f"/api/v1/tasks/{c['id']}/logs",
+        json={"content": "x", "progress": 30, "status": "blocked"}, headers=headers)
+    client.patch(f"/api/v1/tasks/{c['id']}", json={"assignee_id": str(member_user.id)}, headers=headers)
+    client.delete(f"/api/v1/modules/{module.id}", headers=headers)
+
+    stats = client.get(f"/api/v1/projects/{project_id}/stats", headers=headers).json()
+    assert stats["total_tasks"] == 2
+    assert stats["by_status"] == {"todo": 0, "in_progress": 0, "done": 1, "blocked": 1}
+    assert stats["avg_progress"] == 65.0
+    assert stats["member_stats"] == [{"user_id": str(member_user.id), "name": "Dev", "total": 2, "done": 1}]
+    assert b["id"] not in [t["id"] for t in client.get(f"/api/v1/projects/{project_id}/tasks", headers=headers).json()]
+
+    client.delete(f"/api/v1/tasks/{a['id']}", headers=headers)
+    assert client.get(f"/api/v1/projects/{project_id}/stats", headers=headers).json()["total_tasks"] == 1
+    assert rebuild_project_stats(db, project_id) == {}
+
+
+def test_rebuild_project_stats_reports_drift(db, project):
+    from app.models.task import Task
+    from app.services.stats_service import rebuild_project_stats
+    rebuild_project_stats(db, project.id)
+    db.add(Task(project_id=project.id, title="bypassed the service"))
+    db.commit()
+    drift = rebuild_project_stats(db, project.id)
+    assert drift["total"] == (0, 1)
+    assert drift["todo"] == (0, 1)
+    assert rebuild_project_stats(db, project.id) == {}
+
+
+def test_access_decision_is_cached(client, member_token, member_user, project, db, query_counter):
+    from app.models.project import ProjectMember
+    db.add(ProjectMember(project_id=project.id, user_id=member_user.id))
+    db.commit()
+    url = f"/api/v1/projects/{project.id}/tasks"
+    headers = {"Authorization": f"Bearer {member_token}"}
+    assert client.get(url, headers=headers).status_code == 200
+    query_counter.clear()
+    assert client.get(url, headers=headers).status_code == 200
+    assert len(query_counter) == 2  # the ETag version lookup and the task listing
+
+
+def test_remove_member_revokes_cached_access(client, admin_token, member_token, member_user, project):
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    member = {"Authorization": f"Bearer {member_token}"}
+    url = f"/api/v1/projects/{project.id}/tasks"
+    assert client.get(url, headers=member).status_code == 403
+    client.post(f"/api/v1/projects/{project.id}/members", json={"user_id": str(member_user.id)}, headers=admin)
+    assert client.get(url, headers=member).status_code == 200
+    client.delete(f"/api/v1/projects/{project.id}/members/{member_user.id}", headers=admin)
+    assert client.get(url, headers=member).status_code == 403
+
+
+
+def test_deleted_project_is_hidden_then_purged(client, admin_token, member_user, project, db):
+    from app.models.project import ProjectMember
+    from app.models.module import Module
+    from app.models.task import Task, TaskLog, TaskStatus
+    from app.services.purge_service import purge_deleted
+    module = Module(project_id=project.id, name="M")
+    db.add_all([module, ProjectMember(project_id=project.id, user_id=member_user.id)])
+    db.flush()
+    for i in range(7):
+        task = Task(project_id=project.id, module_id=module.id if i % 2 else None, title=f"T{i}")
+        db.add(task)
+        db.flush()
+        db.add(TaskLog(task_id=task.id, user_id=member_user.id, content="x", progress=10, status=TaskStatus.todo))
+    db.commit()
+    project_id = project.id
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    assert client.delete(f"/api/v1/projects/{project_id}", headers=headers).status_code == 204
+    assert client.get(f"/api/v1/projects/{project_id}", headers=headers).status_code == 404
+    assert client.get(f"/api/v1/projects/{project_id}/tasks", headers=headers).status_code == 404
+    assert client.get("/api/v1/projects", headers=headers).json() == []
+    db.expire_all()
+    assert db.query(Task).filter(Task.project_id == project_id).count() == 7
+
+    assert purge_deleted(db, batch_size=3) == 7
+    db.expire_all()
+    assert db.query(Project).filter(Project.id == project_id).first() is None
+    assert db.query(Task).filter(Task.project_id == project_id).count() == 0
+    assert db.query(TaskLog).count() == 0
+    assert db.query(Module).filter(Module.project_id == project_id).count() == 0
+
+
+def test_read_endpoints_answer_304_until_something_changes(client, admin_token, project, db, query_counter):
+    from app.models.stats import ProjectStats
+    db.add(ProjectStats(project_id=project.id))
+    db.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/v1/projects/{project.id}/tasks"
+
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    query_counter.clear()
+    res = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+    assert len(query_counter) == 1  # the version lookup only
+    assert client.get(url + "?limit=5", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    client.post(url, json={"title": "new"}, headers=headers)
+    res = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert [t["title"] for t in res.json()] == ["new"]
+
+    for path in ("/api/v1/projects", f"/api/v1/projects/{project.id}/modules", f"/api/v1/projects/{project.id}/stats"):
+        tag = client.get(path, headers=headers).headers["ETag"]
+        assert client.get(path, headers={**headers, "If-None-Match": tag}).status_code == 304
+    tag = client.get("/api/v1/projects", headers=headers).headers["ETag"]
+    client.patch(f"/api/v1/projects/{project.id}", json={"name": "Renamed"}, headers=headers)
+    assert client.get("/api/v1/projects", headers={**headers, "If-None-Match": tag}).status_code == 200
+
+
+def test_change_feed_replays_from_sequence_number(client, admin_token, member_token, member_user, project, db):
+    from app.models.stats import ProjectStats
+    db.add(ProjectStats(project_id=project.id))
+    db.commit()
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/v1/projects/{project.id}/events"
+
+    client.post(f"/api/v1/projects/{project.id}/members", json={"user_id": str(member_user.id)}, headers=admin)
+    task = client.post(f"/api/v1/projects/{project.id}/tasks",
+                       json={"title": "T", "assignee_id": str(member_user.id)}, headers=admin).json()
+    log = client.post(f"/api/v1/tasks/{task['id']}/logs", json={"content": "x", "progress": 50, "status": "in_progress"},
+                      headers={"Authorization": f"Bearer {member_token}"}).json()
+    client.delete(f"/api/v1/tasks/{task['id']}", headers=admin)
+
+    events = client.get(url, headers=admin).json()
+    assert [e["kind"] for e in events] == ["member.added", "task.created", "log.created", "task.deleted"]
+    assert events[1]["payload"] == {"ids": [task["id"]]}
+    assert events[2]["payload"] == {"task_id": task["id"], "id": log["id"]}
+    assert [e["id"] for e in events] == sorted(e["id"] for e in events)
+
+    replay = client.get(url, params={"since": events[1]["id"]}, headers=admin).json()
+    assert [e["kind"] for e in replay] == ["log.created", "task.deleted"]
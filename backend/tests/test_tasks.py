@@ -68,3 +68,345 @@ def test_logs_history(client, member_token, project, task, member_in_project):
     assert res.status_code == 200
     assert len(res.json()) == 2
     assert res.json()[0]["progress"] == 50  # 最新在前
+
+
+@pytest.fixture
+def many_tasks(db, project, member_user):
+    from datetime import datetime, date, timedelta, timezone
+    from app.models.task import TaskStatus
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    tasks = []
+    for i in range(5):
+        t = Task(project_id=project.id, title=f"T{i}", description="long text",
+                 status=TaskStatus.done if i % 2 else TaskStatus.todo,
+                 assignee_id=member_user.id if i < 2 else None,
+                 due_date=date(2026, 2, 1) + timedelta(days=i),
+                 created_at=base + timedelta(minutes=i))
+        db.add(t)
+        tasks.append(t)
+    db.commit()
+    return tasks
+
+
+def test_list_tasks_keyset_pagination(client, admin_token, project, many_tasks):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    titles, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        res = client.get(f"/api/v1/projects/{project.id}/tasks", params=params, headers=headers)
+        assert res.status_code == 200
+        titles += [t["title"] for t in res.json()]
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert titles == ["T0", "T1", "T2", "T3", "T4"]
+
+
+def test_list_tasks_filters(client, admin_token, project, member_user, many_tasks):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/v1/projects/{project.id}/tasks"
+    done = client.get(url, params={"status": "done"}, headers=headers).json()
+    assert [t["title"] for t in done] == ["T1", "T3"]
+    mine = client.get(url, params={"assignee_id": str(member_user.id)}, headers=headers).json()
+    assert [t["title"] for t in mine] == ["T0", "T1"]
+    due = client.get(url, params={"due_from": "2026-02-02", "due_to": "2026-02-03"}, headers=headers).json()
+    assert [t["title"] for t in due] == ["T1", "T2"]
+
+
+def test_list_tasks_sparse_fields(client, admin_token, project, many_tasks):
+    res = client.get(f"/api/v1/projects/{project.id}/tasks", params={"fields": "title,status"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert res.status_code == 200
+    assert set(res.json()[0]) == {"id", "title", "status"}
+
+    bad = client.get(f"/api/v1/projects/{project.id}/tasks", params={"fields": "secret"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert bad.status_code == 400
+
+
+def test_list_tasks_query_count_is_constant(client, admin_token, project, member_user, db, query_counter):
+    from app.models.module import Module
+    module = Module(project_id=project.id, name="M", owner_id=member_user.id)
+    db.add(module)
+    db.commit()
+    url = f"/api/v1/projects/{project.id}/tasks"
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    def count_for(n):
+        db.add_all([Task(project_id=project.id, title=f"T{i}", assignee_id=member_user.id, module_id=module.id)
+                    for i in range(n)])
+        db.commit()
+        query_counter.clear()
+        res = client.get(url, headers=headers)
+        assert res.status_code == 200
+        assert all(t["assignee"]["name"] == "Dev" and t["module"]["name"] == "M" for t in res.json())
+        return len(query_counter)
+
+    client.get(url, headers=headers)  # warm the principal cache
+    assert count_for(1) == count_for(10)
+
+
+def test_list_logs_query_count_is_constant(client, admin_token, project, task, member_user, db, query_counter):
+    from app.models.task import TaskLog, TaskStatus
+    url = f"/api/v1/tasks/{task.id}/logs"
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    def count_for(n):
+        db.add_all([TaskLog(task_id=task.id, user_id=member_user.id, content=f"c{i}", progress=i,
+                            status=TaskStatus.in_progress) for i in range(n)])
+        db.commit()
+        query_counter.clear()
+        res = client.get(url, headers=headers)
+        assert res.status_code == 200
+        assert all(log["user"]["name"] == "Dev" for log in res.json())
+        return len(query_counter)
+
+    client.get(url, headers=headers)  # warm the principal cache
+    assert count_for(1) == count_for(10)
+
+
+@pytest.fixture
+def timeline(db, task, member_user):
+    from datetime import datetime, timedelta, timezone
+    from app.models.task import TaskLog, TaskStatus
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    logs = [TaskLog(task_id=task.id, user_id=member_user.id, content=f"day{i}", progress=i * 10,
+                    status=TaskStatus.in_progress, created_at=base + timedelta(days=i)) for i in range(5)]
+    db.add_all(logs)
+    db.commit()
+    return logs
+
+
+def test_logs_limit_and_before(client, admin_token, project, task, timeline):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/v1/tasks/{task.id}/logs"
+    page1 = client.get(url, params={"limit": 2}, headers=headers).json()
+    assert [log["content"] for log in page1] == ["day4", "day3"]
+    page2 = client.get(url, params={"limit": 2, "before": page1[-1]["id"]}, headers=headers).json()
+    assert [log["content"] for log in page2] == ["day2", "day1"]
+
+
+def test_logs_since(client, admin_token, project, task, timeline):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/v1/tasks/{task.id}/logs"
+    newer = client.get(url, params={"since": str(timeline[1].id)}, headers=headers).json()
+    assert [log["content"] for log in newer] == ["day4", "day3", "day2"]
+    oldest_first = client.get(url, params={"since": str(timeline[1].id), "limit": 2}, headers=headers).json()
+    assert [log["content"] for log in oldest_first] == ["day3", "day2"]
+    assert client.get(url, params={"since": str(timeline[4].id)}, headers=headers).json() == []
+
+
+def test_async_listing_matches_sync(db, admin_user, project, many_tasks, timeline, task):
+    import asyncio
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from app.database import async_database_url
+    from app.services import task_service
+    from app.services.project_service import check_project_access_async, get_accessible_projects_async
+    from tests.conftest import TEST_DATABASE_URL
+
+    async def run():
+        async_engine = create_async_engine(async_database_url(TEST_DATABASE_URL))
+        try:
+            async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+                await check_project_access_async(session, project.id, admin_user)
+                projects = await get_accessible_projects_async(session, admin_user)
+                tasks = await task_service.list_tasks_async(session, project.id, limit=3)
+                logs = await task_service.list_logs_async(session, task.id, limit=2, before=timeline[-1].id)
+                return ([p.id for p in projects], [(t.id, t.assignee and t.assignee.name) for t in tasks],
+                        [(l.id, l.user.name) for l in logs])
+        finally:
+            await async_engine.dispose()
+
+    projects, tasks, logs = asyncio.run(run())
+    assert projects == [project.id]
+    assert tasks == [(t.id, t.assignee and t.assignee.name) for t in task_service.list_tasks(db, project.id, limit=3)]
+    assert logs == [(l.id, l.user.name) for l in task_service.list_logs(db, task.id, limit=2, before=timeline[-1].id)]
+
+
+def test_bulk_upsert_creates_and_updates(client, admin_token, project, task, member_user, db):
+    from app.services.stats_service import rebuild_project_stats
+    rebuild_project_stats(db, project.id)
+    db.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    res = client.post(f"/api/v1/projects/{project.id}/tasks/bulk", json={"tasks": [
+        {"title": "New A", "assignee_id": str(member_user.id)},
+        {"id": str(task.id), "status": "done", "progress": 100},
+        {"title": "New B", "priority": "high"},
+    ]}, headers=headers)
+    assert res.status_code == 200
+    assert (res.json()["created"], res.json()["updated"]) == (2, 1)
+    assert res.json()["ids"][1] == str(task.id)
+    listed = client.get(f"/api/v1/projects/{project.id}/tasks", headers=headers).json()
+    assert [t["title"] for t in listed] == ["T1", "New A", "New B"]
+    assert listed[0]["status"] == "done"
+    assert rebuild_project_stats(db, project.id) == {}
+
+
+
+def test_bulk_upsert_rejects_null_title(client, admin_token, project, task, db):
+    res = client.post(f"/api/v1/projects/{project.id}/tasks/bulk",
+                      json={"tasks": [{"id": str(task.id), "title": None}]},
+                      headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 422
+    db.refresh(task)
+    assert task.title == "T1"
+
+def test_bulk_upsert_reports_rows_and_writes_nothing(client, member_token, project, member_in_project, db):
+    from app.models.module import Module
+    other = Module(project_id=project.id, name="Other", owner_id=project.owner_id)
+    db.add(other)
+    db.commit()
+    res = client.post(f"/api/v1/projects/{project.id}/tasks/bulk", json={"tasks": [
+        {"title": "No module"},
+        {"title": "Not mine", "module_id": str(other.id)},
+    ]}, headers={"Authorization": f"Bearer {member_token}"})
+    assert res.status_code == 422
+    assert res.json()["detail"] == [
+        {"row": 0, "detail": "Not authorized"},
+        {"row": 1, "detail": "Not authorized: not module owner"},
+    ]
+    assert db.query(Task).count() == 0
+
+
+def test_bulk_upsert_checks_each_module_once(client, admin_token, project, db, query_counter):
+    from app.models.module import Module
+    modules = [Module(project_id=project.id, name=f"M{i}") for i in range(2)]
+    db.add_all(modules)
+    db.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/v1/projects/{project.id}/tasks/bulk"
+    client.post(url, json={"tasks": [{"title": "warm"}]}, headers=headers)
+
+    def count_for(n):
+        query_counter.clear()
+        tasks = [{"title": f"T{i}", "module_id": str(modules[i % 2].id)} for i in range(n)]
+        assert client.post(url, json={"tasks": tasks}, headers=headers).status_code == 200
+        return len(query_counter)
+    assert count_for(2) == count_for(50)
+
+
+def test_import_round_trips_the_export(client, admin_token, project, many_tasks, member_user, db):
+    from app.models.project import Project
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    exported = client.get(f"/api/v1/projects/{project.id}/export", headers=headers).content
+    target = Project(name="Q", owner_id=project.owner_id)
+    db.add(target)
+    db.commit()
+    res = client.post(f"/api/v1/projects/{target.id}/tasks/import",
+                      files={"file": ("plan.xlsx", exported)}, headers=headers)
+    assert res.status_code == 200, res.json()
+    assert res.json()["created"] == 5
+    src = client.get(f"/api/v1/projects/{project.id}/tasks", headers=headers).json()
+    dst = client.get(f"/api/v1/projects/{target.id}/tasks", headers=headers).json()
+    keys = ("title", "status", "priority", "due_date", "progress", "description")
+    assert [[t[k] for k in keys] + [t["assignee"] and t["assignee"]["id"]] for t in dst] == \
+           [[t[k] for k in keys] + [t["assignee"] and t["assignee"]["id"]] for t in src]
+
+
+def test_import_csv_reports_spreadsheet_rows(client, admin_token, project, db):
+    csv_text = "任务标题,模块,负责人,状态,进度(%)\nA,未分配,,待办,0\n,,,,\nB,Nope,,,\nC,,ghost@test.com,,\nD,,,进行中,150\n"
+    res = client.post(f"/api/v1/projects/{project.id}/tasks/import",
+                      files={"file": ("plan.csv", csv_text.encode("utf-8-sig"))},
+                      headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 422
+    assert [e["row"] for e in res.json()["detail"]] == [4, 5, 6]
+    assert res.json()["detail"][0]["detail"] == "Unknown module: Nope"
+    assert db.query(Task).count() == 0
+
+
+def test_batch_update_by_filter_with_logs(client, admin_token, project, member_user, many_tasks, db):
+    from app.models.task import TaskLog
+    from app.services.stats_service import rebuild_project_stats
+    rebuild_project_stats(db, project.id)
+    db.commit()
+    res = client.patch(f"/api/v1/projects/{project.id}/tasks", json={
+        "filter": {"status": ["todo"]},
+        "changes": {"status": "done", "progress": 100},
+        "log": "批量完成",
+    }, headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 200
+    assert res.json()["updated"] == 3
+    assert res.json()["ids"] == [str(many_tasks[i].id) for i in (0, 2, 4)]
+    assert db.query(TaskLog).filter(TaskLog.content == "批量完成", TaskLog.progress == 100).count() == 3
+    assert rebuild_project_stats(db, project.id) == {}
+
+
+def test_batch_update_by_ids_reports_missing(client, admin_token, project, admin_user, many_tasks):
+    import uuid
+    ghost = uuid.uuid4()
+    res = client.patch(f"/api/v1/projects/{project.id}/tasks", json={
+        "ids": [str(many_tasks[0].id), str(ghost)],
+        "changes": {"assignee_id": str(admin_user.id)},
+    }, headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.json() == {"updated": 1, "ids": [str(many_tasks[0].id)], "missing": [str(ghost)]}
+
+
+def test_batch_update_checks_module_ownership(client, member_token, project, member_in_project, many_tasks, db):
+    url = f"/api/v1/projects/{project.id}/tasks"
+    headers = {"Authorization": f"Bearer {member_token}"}
+    res = client.patch(url, json={"ids": [str(many_tasks[0].id)], "changes": {"status": "done"}}, headers=headers)
+    assert res.status_code == 403
+    res = client.patch(url, json={"changes": {"status": "done"}}, headers=headers)
+    assert res.status_code == 400
+
+
+def test_search_ranks_and_scopes_results(client, member_token, project, member_in_project, member_user, admin_user, db):
+    from app.models.task import TaskLog, TaskStatus
+    other = Project(name="Other", owner_id=admin_user.id)
+    db.add(other)
+    db.flush()
+    in_title = Task(project_id=project.id, title="修复登录超时")
+    in_description = Task(project_id=project.id, title="认证", description="登录页面偶尔超时")
+    in_log = Task(project_id=project.id, title="排查网关")
+    hidden = Task(project_id=other.id, title="登录超时")
+    db.add_all([in_title, in_description, in_log, hidden, Task(project_id=project.id, title="无关")])
+    db.flush()
+    db.add(TaskLog(task_id=in_log.id, user_id=member_user.id, content="原因是登录超时", progress=0, status=TaskStatus.todo))
+    db.commit()
+    headers = {"Authorization": f"Bearer {member_token}"}
+
+    res = client.get("/api/v1/tasks/search", params={"q": "登录"}, headers=headers)
+    assert res.status_code == 200
+    hits = res.json()
+    assert [h["id"] for h in hits][0] == str(in_title.id)
+    assert {h["id"] for h in hits} == {str(in_title.id), str(in_description.id), str(in_log.id)}
+    assert hits[0]["rank"] >= hits[1]["rank"] >= hits[2]["rank"]
+
+    page = client.get("/api/v1/tasks/search", params={"q": "登录", "limit": 2, "offset": 2}, headers=headers).json()
+    assert [h["id"] for h in page] == [hits[2]["id"]]
+    assert client.get("/api/v1/tasks/search", params={"q": "100%"}, headers=headers).json() == []
+
+
+def test_my_tasks_across_projects(client, member_token, project, member_in_project, member_user, admin_user, db, query_counter):
+    from datetime import date
+    from app.models.task import TaskPriority, TaskStatus
+    second = Project(name="P2", owner_id=admin_user.id)
+    unjoined = Project(name="P3", owner_id=admin_user.id)
+    db.add_all([second, unjoined])
+    db.flush()
+    db.add(ProjectMember(project_id=second.id, user_id=member_user.id))
+    db.add_all([
+        Task(project_id=project.id, title="later", assignee_id=member_user.id, due_date=date(2026, 12, 1)),
+        Task(project_id=second.id, title="soon, urgent", assignee_id=member_user.id,
+             due_date=date(2026, 11, 1), priority=TaskPriority.urgent),
+        Task(project_id=project.id, title="soon, low", assignee_id=member_user.id,
+             due_date=date(2026, 11, 1), priority=TaskPriority.low),
+        Task(project_id=second.id, title="undated", assignee_id=member_user.id),
+        Task(project_id=second.id, title="finished", assignee_id=member_user.id, status=TaskStatus.done),
+        Task(project_id=unjoined.id, title="not a member", assignee_id=member_user.id),
+        Task(project_id=project.id, title="someone else's", assignee_id=admin_user.id),
+    ])
+    db.commit()
+    headers = {"Authorization": f"Bearer {member_token}"}
+
+    res = client.get("/api/v1/me/tasks", params={"status": "todo"}, headers=headers)
+    query_counter.clear()
+    res = client.get("/api/v1/me/tasks", params={"status": "todo"}, headers=headers)
+    assert res.status_code == 200
+    assert [t["title"] for t in res.json()] == ["soon, urgent", "soon, low", "later", "undated"]
+    assert len(query_counter) == 1
+
+    res = client.get("/api/v1/me/tasks", params={"due_to": "2026-11-30"}, headers=headers)
+    assert [t["title"] for t in res.json()] == ["soon, urgent", "soon, low"]
@@ -27,3 +27,103 @@ def test_duplicate_email_rejected(client, admin_token, admin_user):
         headers={"Authorization": f"Bearer {admin_token}"}
     )
     assert res.status_code == 400
+
+
+def test_bulk_create_users_with_memberships(client, admin_token, admin_user, db, query_counter):
+    from app.models.project import Project, ProjectMember
+    p = Project(name="P", owner_id=admin_user.id)
+    q = Project(name="Q", owner_id=admin_user.id)
+    db.add_all([p, q])
+    db.commit()
+    users = [{"name": f"U{i}", "email": f"u{i}@test.com", "password": "pass123"} for i in range(30)]
+    users[0]["project_ids"] = [str(q.id)]
+    query_counter.clear()
+    res = client.post("/api/v1/users/bulk", json={"users": users, "project_ids": [str(p.id)]},
+                      headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 201, res.json()
+    assert res.json()["created"] == 30
+    assert res.json()["memberships"] == 31
+    assert len([s for s in query_counter if s.lstrip().upper().startswith("INSERT INTO USERS")]) == 1
+    assert db.query(ProjectMember).filter_by(project_id=p.id).count() == 30
+    login = client.post("/api/v1/auth/login", json={"email": "u7@test.com", "password": "pass123"})
+    assert login.status_code == 200
+
+
+def test_bulk_create_reports_rows_and_writes_nothing(client, admin_token, admin_user, db):
+    from app.models.user import User
+    users = [
+        {"name": "A", "email": "a@test.com", "password": "x"},
+        {"name": "Admin again", "email": "admin@test.com", "password": "x"},
+        {"name": "A again", "email": "a@test.com", "password": "x"},
+    ]
+    res = client.post("/api/v1/users/bulk", json={"users": users},
+                      headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 422
+    assert res.json()["detail"] == [{"row": 1, "detail": "Email already registered"},
+                                    {"row": 2, "detail": "Duplicate email"}]
+    assert db.query(User).count() == 1
+
+
+def test_bulk_create_only_joins_own_projects(client, admin_token, admin_user, db):
+    from app.models.project import Project, ProjectMember
+    from app.models.user import User, UserRole
+    other = User(name="Other", email="other@test.com", password_hash="x", role=UserRole.admin)
+    db.add(other)
+    db.flush()
+    theirs = Project(name="Theirs", owner_id=other.id)
+    db.add(theirs)
+    db.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    user = {"name": "A", "email": "a@test.com", "password": "x"}
+    res = client.post("/api/v1/users/bulk", json={"users": [user], "project_ids": [str(theirs.id)]}, headers=headers)
+    assert res.status_code == 403
+    res = client.post("/api/v1/users/bulk", json={"users": [{**user, "project_ids": [str(theirs.id)]}]},
+                      headers=headers)
+    assert res.status_code == 422
+    assert res.json()["detail"][0]["detail"].startswith("Not your project")
+    assert db.query(ProjectMember).count() == 0
+
+
+def test_import_users_csv(client, admin_token, admin_user, member_token):
+    csv_text = "姓名,邮箱,密码,角色\n张三,zhang@test.com,pass123,成员\n李四,li@test.com,pass123,管理员\n"
+    res = client.post("/api/v1/users/import", files={"file": ("users.csv", csv_text.encode("utf-8-sig"))},
+                      headers={"Authorization": f"Bearer {admin_token}"})
+    assert res.status_code == 201, res.json()
+    assert res.json()["created"] == 2
+    res = client.post("/api/v1/users/import", files={"file": ("users.csv", csv_text.encode("utf-8-sig"))},
+                      headers={"Authorization": f"Bearer {member_token}"})
+    assert res.status_code == 403
+
+
+def test_user_directory_search_and_pages(client, admin_token, admin_user, db):
+    from app.models.project import Project, ProjectMember
+    from app.models.user import User
+    users = [User(name=name, email=f"u{i}@corp.com", password_hash="x")
+             for i, name in enumerate(["张伟", "张敏", "王芳", "Zhang Wei", "李娜"])]
+    db.add_all(users)
+    db.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    names = lambda res: sorted(u["name"] for u in res.json())
+    assert names(client.get("/api/v1/users", params={"q": "张"}, headers=headers)) == sorted(["张伟", "张敏"])
+    assert names(client.get("/api/v1/users", params={"q": "zhang"}, headers=headers)) == ["Zhang Wei"]
+    assert names(client.get("/api/v1/users", params={"q": "g wei"}, headers=headers)) == ["Zhang Wei"]
+    assert names(client.get("/api/v1/users", params={"q": "u2@corp"}, headers=headers)) == ["王芳"]
+
+    p = Project(name="P", owner_id=admin_user.id)
+    db.add(p)
+    db.flush()
+    db.add(ProjectMember(project_id=p.id, user_id=users[0].id))
+    db.commit()
+    res = client.get("/api/v1/users", params={"q": "张", "exclude_project_id": str(p.id)}, headers=headers)
+    assert names(res) == ["张敏"]
+
+    seen, cursor = [], None
+    while True:
+        res = client.get("/api/v1/users", params={"limit": 2, **({"cursor": cursor} if cursor else {})},
+                         headers=headers)
+        seen += res.json()
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len({u["id"] for u in seen}) == len(seen) == 6
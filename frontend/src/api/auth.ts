@@ -4,8 +4,17 @@ import type { User, LoginResponse } from './types'
 export const authApi = {
   login: (email: string, password: string) =>
     client.post<LoginResponse>('/auth/login', { email, password }),
+  // Reads both tokens up front: the caller clears them right after.
+  logout: () =>
+    client.post(
+      '/auth/logout',
+      { refresh_token: localStorage.getItem('refresh_token') },
+      { headers: { Authorization: `Bearer ${localStorage.getItem('access_token')}` } },
+    ),
   me: () => client.get<User>('/auth/me'),
-  listUsers: () => client.get<User[]>('/users'),
+  // Pages of the directory; X-Next-Cursor carries the next page's cursor
+  listUsers: (params?: { q?: string; exclude_project_id?: string; limit?: number; cursor?: string }) =>
+    client.get<User[]>('/users', { params }),
   createUser: (data: { name: string; email: string; password: string; role: string }) =>
     client.post<User>('/users', data),
 }
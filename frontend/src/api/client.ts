@@ -1,10 +1,44 @@
-import axios from 'axios'
+import axios, { type AxiosRequestConfig } from 'axios'
+import type { LoginResponse } from './types'
+
+const baseURL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1'
 
 export const client = axios.create({
-  baseURL: import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1',
+  baseURL,
   timeout: 10000,
 })
 
+export function saveTokens(tokens: Pick<LoginResponse, 'access_token' | 'refresh_token'>) {
+  localStorage.setItem('access_token', tokens.access_token)
+  localStorage.setItem('refresh_token', tokens.refresh_token)
+}
+
+export function clearTokens() {
+  localStorage.removeItem('access_token')
+  localStorage.removeItem('refresh_token')
+}
+
+// Access tokens are short-lived: on a 401, exchange the refresh token once
+// (shared by all requests failing at the same time) and retry.
+let refreshing: Promise<string> | null = null
+const NO_REFRESH = ['/auth/login', '/auth/refresh', '/auth/logout']
+
+function refreshAccessToken(): Promise<string> {
+  if (!refreshing) {
+    const refresh_token = localStorage.getItem('refresh_token')
+    refreshing = (refresh_token
+      ? axios.post<LoginResponse>(`${baseURL}/auth/refresh`, { refresh_token }).then((res) => {
+          saveTokens(res.data)
+          return res.data.access_token
+        })
+      : Promise.reject(new Error('no refresh token'))
+    ).finally(() => {
+      refreshing = null
+    })
+  }
+  return refreshing
+}
+
 client.interceptors.request.use((config) => {
   const token = localStorage.getItem('access_token')
   if (token) config.headers.Authorization = `Bearer ${token}`
@@ -13,9 +47,20 @@ client.interceptors.request.use((config) => {
 
 client.interceptors.response.use(
   (res) => res,
-  (err) => {
+  async (err) => {
+    const config = err.config as (AxiosRequestConfig & { _retried?: boolean }) | undefined
+    if (err.response?.status === 401 && config && !config._retried && !NO_REFRESH.includes(config.url ?? '')) {
+      config._retried = true
+      try {
+        const token = await refreshAccessToken()
+        config.headers = { ...config.headers, Authorization: `Bearer ${token}` }
+        return client(config)
+      } catch {
+        // fall through to the login redirect
+      }
+    }
     if (err.response?.status === 401) {
-      localStorage.removeItem('access_token')
+      clearTokens()
       window.location.href = '/login'
     }
     return Promise.reject(err)
@@ -64,6 +64,8 @@ export interface ProjectStats {
 
 export interface LoginResponse {
   access_token: string
+  refresh_token: string
+  expires_in: number
   user_id: string
   role: string
   name: string
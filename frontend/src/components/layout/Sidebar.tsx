@@ -2,6 +2,8 @@ import { NavLink, useNavigate } from 'react-router-dom'
 import { LayoutDashboard, FolderKanban, Users, LogOut, Plus } from 'lucide-react'
 import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { projectsApi } from '@/api/projects'
+import { authApi } from '@/api/auth'
+import { clearTokens } from '@/api/client'
 import { useAuth } from '@/hooks/useAuth'
 import { cn } from '@/lib/utils'
 
@@ -17,7 +19,8 @@ export function Sidebar() {
   })
 
   function handleLogout() {
-    localStorage.removeItem('access_token')
+    authApi.logout().catch(() => {})
+    clearTokens()
     qc.clear()
     navigate('/login')
   }
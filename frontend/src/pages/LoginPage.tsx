@@ -2,6 +2,7 @@ import { useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { Eye, EyeOff, Loader2 } from 'lucide-react'
 import { authApi } from '@/api/auth'
+import { saveTokens } from '@/api/client'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { cn } from '@/lib/utils'
@@ -20,7 +21,7 @@ export default function LoginPage() {
     setLoading(true)
     try {
       const loginRes = await authApi.login(email, password)
-      localStorage.setItem('access_token', loginRes.data.access_token)
+      saveTokens(loginRes.data)
       navigate('/projects')
     } catch (err: unknown) {
       const msg =
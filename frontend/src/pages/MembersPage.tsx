@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useParams, Link } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { ChevronLeft, UserPlus, Trash2 } from 'lucide-react'
@@ -6,6 +6,7 @@ import { toast } from 'sonner'
 import { projectsApi } from '@/api/projects'
 import { authApi } from '@/api/auth'
 import { Button } from '@/components/ui/button'
+import { Input } from '@/components/ui/input'
 import { Skeleton } from '@/components/ui/skeleton'
 import {
   Dialog,
@@ -33,22 +34,33 @@ export function MembersPage() {
   const queryClient = useQueryClient()
   const [selectedUserId, setSelectedUserId] = useState('')
   const [dialogOpen, setDialogOpen] = useState(false)
+  const [search, setSearch] = useState('')
+  const [query, setQuery] = useState('')
+
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(search.trim()), 300)
+    return () => clearTimeout(timer)
+  }, [search])
 
   const { data: members, isLoading: membersLoading } = useQuery({
     queryKey: ['members', projectId],
     queryFn: () => projectsApi.getMembers(projectId).then(r => r.data),
   })
 
-  const { data: allUsers, isLoading: usersLoading } = useQuery({
-    queryKey: ['users'],
-    queryFn: () => authApi.listUsers().then(r => r.data),
-    enabled: isAdmin,
+  const { data: availableUsers = [], isLoading: usersLoading } = useQuery({
+    queryKey: ['users', 'picker', projectId, query],
+    queryFn: () =>
+      authApi
+        .listUsers({ q: query || undefined, exclude_project_id: projectId, limit: 20 })
+        .then(r => r.data),
+    enabled: isAdmin && dialogOpen,
   })
 
   const addMemberMutation = useMutation({
     mutationFn: (userId: string) => projectsApi.addMember(projectId, userId),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['members', projectId] })
+      queryClient.invalidateQueries({ queryKey: ['users', 'picker', projectId] })
       toast.success('成员已添加')
       setSelectedUserId('')
       setDialogOpen(false)
@@ -60,14 +72,12 @@ export function MembersPage() {
     mutationFn: (userId: string) => projectsApi.removeMember(projectId, userId),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['members', projectId] })
+      queryClient.invalidateQueries({ queryKey: ['users', 'picker', projectId] })
       toast.success('成员已移除')
     },
     onError: () => toast.error('移除失败'),
   })
 
-  const memberIds = new Set(members?.map((m: User) => m.id) ?? [])
-  const availableUsers = (allUsers ?? []).filter((u: User) => !memberIds.has(u.id))
-
   return (
     <div className="min-h-screen bg-[#fafafa]">
       <div className="max-w-3xl mx-auto px-6 py-8">
@@ -95,7 +105,13 @@ export function MembersPage() {
                 <DialogHeader>
                   <DialogTitle className="text-[#191919] font-bold text-base">添加成员</DialogTitle>
                 </DialogHeader>
-                <div className="py-4">
+                <div className="py-4 space-y-3">
+                  <Input
+                    value={search}
+                    onChange={e => setSearch(e.target.value)}
+                    placeholder="搜索姓名或邮箱"
+                    className="h-9 text-sm border-[#e8e8e6] focus-visible:ring-0 focus-visible:border-[#191919]"
+                  />
                   {usersLoading ? (
                     <Skeleton className="h-9 w-full rounded-md" />
                   ) : availableUsers.length === 0 ? (
@@ -1,5 +1,5 @@
-import { useState } from 'react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useEffect, useState } from 'react'
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { UserPlus } from 'lucide-react'
 import { toast } from 'sonner'
 import { authApi } from '@/api/auth'
@@ -32,12 +32,26 @@ export function UsersPage() {
 
   const [dialogOpen, setDialogOpen] = useState(false)
   const [form, setForm] = useState({ name: '', email: '', password: '', role: 'member' })
+  const [search, setSearch] = useState('')
+  const [query, setQuery] = useState('')
 
-  const { data: users, isLoading } = useQuery({
-    queryKey: ['users'],
-    queryFn: () => authApi.listUsers().then(r => r.data),
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(search.trim()), 300)
+    return () => clearTimeout(timer)
+  }, [search])
+
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['users', 'directory', query],
+    queryFn: ({ pageParam }) =>
+      authApi.listUsers({ q: query || undefined, cursor: pageParam }).then(r => ({
+        users: r.data,
+        next: (r.headers['x-next-cursor'] as string | undefined) ?? undefined,
+      })),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: page => page.next,
     enabled: isAdmin,
   })
+  const users = data?.pages.flatMap(page => page.users)
 
   const createUserMutation = useMutation({
     mutationFn: (data: { name: string; email: string; password: string; role: string }) =>
@@ -152,6 +166,13 @@ export function UsersPage() {
           </Dialog>
         </div>
 
+        <Input
+          value={search}
+          onChange={e => setSearch(e.target.value)}
+          placeholder="搜索姓名或邮箱"
+          className="mb-4 h-9 text-sm bg-white border-[#e8e8e6] focus-visible:ring-0 focus-visible:border-[#191919]"
+        />
+
         {/* Table */}
         <div className="bg-white rounded-lg border border-[#e8e8e6] shadow-sm overflow-hidden">
           <table className="w-full">
@@ -218,6 +239,19 @@ export function UsersPage() {
             </tbody>
           </table>
         </div>
+
+        {hasNextPage && (
+          <div className="flex justify-center mt-4">
+            <Button
+              variant="ghost"
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="h-9 px-4 text-sm text-[#555555]"
+            >
+              {isFetchingNextPage ? '加载中...' : '加载更多'}
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   )